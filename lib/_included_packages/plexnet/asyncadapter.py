@@ -1,6 +1,7 @@
 from __future__ import absolute_import
 import time
 import socket
+import threading
 import six
 
 import requests
@@ -18,6 +19,8 @@ except ImportError:
 from requests.adapters import HTTPAdapter
 from requests.compat import urlparse
 
+from . import util
+
 #from six.moves.http_client import HTTPConnection
 import errno
 
@@ -37,6 +40,50 @@ def ABORT_FLAG_FUNCTION():
     return False
 
 
+# the adapter currently sending a request on this thread; connections checked out of a shared pool while it's set
+# are claimed by that adapter, so cancelling it only affects its own in-flight connections
+_OWNER = threading.local()
+
+# the CancelToken of the work running on this thread, if any
+_TOKEN = threading.local()
+
+
+def currentToken():
+    return getattr(_TOKEN, 'token', None)
+
+
+def _claimConnection(conn):
+    owner = getattr(_OWNER, 'adapter', None)
+    if owner is not None:
+        owner.claim(conn)
+
+    token = currentToken()
+    if token is not None:
+        token.attach(conn)
+
+
+def _releaseConnection(conn):
+    owner = getattr(conn, '_owner', None)
+    if owner is not None:
+        owner.release(conn)
+
+    token = getattr(conn, '_token', None)
+    if token is not None:
+        token.detach(conn)
+
+
+def _shutdownSocket(sock):
+    # shut the raw socket down (not SSLSocket.shutdown, which drops its SSL object under a reading thread) so a
+    # blocked recv on another thread returns right away
+    if not isinstance(sock, socket.socket):
+        return
+
+    try:
+        socket.socket.shutdown(sock, socket.SHUT_RDWR)
+    except (socket.error, OSError):
+        pass
+
+
 class TimeoutException(Exception):
     pass
 
@@ -77,11 +124,14 @@ DEFAULT_TIMEOUT = AsyncTimeout(10).setConnectTimeout(10)
 
 
 class AsyncVerifiedHTTPSConnection(VerifiedHTTPSConnection):
-    __slots__ = ("_canceled", "deadline", "_timeout")
+    __slots__ = ("_canceled", "deadline", "_timeout", "_owner", "_token", "_socket")
 
     def __init__(self, *args, **kwargs):
         VerifiedHTTPSConnection.__init__(self, *args, **kwargs)
         self._canceled = False
+        self._owner = None
+        self._token = None
+        self._socket = None
         self.deadline = 0
         self._timeout = AsyncTimeout(DEFAULT_TIMEOUT)
 
@@ -156,6 +206,7 @@ class AsyncVerifiedHTTPSConnection(VerifiedHTTPSConnection):
             raise socket.error((error,))
 
     def _new_conn(self):
+        POOLS.stats.handshakes += 1
         sock = self.create_connection(
             address=(self.host, self.port),
             timeout=self.timeout
@@ -163,28 +214,72 @@ class AsyncVerifiedHTTPSConnection(VerifiedHTTPSConnection):
 
         return sock
 
+    def connect(self):
+        VerifiedHTTPSConnection.connect(self)
+        self._socket = self.sock
+
     def cancel(self):
         self._canceled = True
 
+    def abort(self):
+        self.cancel()
+        _shutdownSocket(self._socket)
+
 
 class AsyncHTTPConnection(HTTPConnection):
-    __slots__ = ("_canceled", "deadline")
+    __slots__ = ("_canceled", "deadline", "_owner", "_token", "_socket")
     def __init__(self, *args, **kwargs):
         HTTPConnection.__init__(self, *args, **kwargs)
         self._canceled = False
+        self._owner = None
+        self._token = None
+        # self.sock is dropped once a response that closes the connection arrives, while its body is still read
+        # from the socket
+        self._socket = None
         self.deadline = 0
 
+    def _new_conn(self):
+        POOLS.stats.handshakes += 1
+        sock = HTTPConnection._new_conn(self)
+        # the plain connect blocks, so a cancel arriving meanwhile is only seen here
+        if self._canceled:
+            sock.close()
+            raise CanceledException('Request canceled')
+        return sock
+
+    def connect(self):
+        HTTPConnection.connect(self)
+        self._socket = self.sock
+
     def cancel(self):
         self._canceled = True
 
+    def abort(self):
+        self.cancel()
+        _shutdownSocket(self._socket)
 
-class AsyncHTTPConnectionPool(HTTPConnectionPool):
-    __slots__ = ("connections",)
 
-    def __init__(self, *args, **kwargs):
-        HTTPConnectionPool.__init__(self, *args, **kwargs)
-        self.connections = []
+class AsyncPoolMixin(object):
+    """
+    Hands out connections claimed by the adapter sending on the current thread and never puts a canceled
+    connection back into the pool.
+    """
+    def _get_conn(self, timeout=None):
+        conn = super(AsyncPoolMixin, self)._get_conn(timeout=timeout)
+        _claimConnection(conn)
+        return conn
+
+    def _put_conn(self, conn):
+        if conn is not None:
+            _releaseConnection(conn)
+            if getattr(conn, '_canceled', False):
+                conn.close()
+                conn = None
+
+        return super(AsyncPoolMixin, self)._put_conn(conn)
+
 
+class AsyncHTTPConnectionPool(AsyncPoolMixin, HTTPConnectionPool):
     def _new_conn(self):
         """
         Return a fresh :class:`httplib.HTTPConnection`.
@@ -204,22 +299,10 @@ class AsyncHTTPConnectionPool(HTTPConnectionPool):
             # Mark this connection as not reusable
             conn.auto_open = 0
 
-        self.connections.append(conn)
-
         return conn
 
-    def cancel(self):
-        for c in self.connections:
-            c.cancel()
-
-
-class AsyncHTTPSConnectionPool(HTTPSConnectionPool):
-    __slots__ = ("connections",)
-
-    def __init__(self, *args, **kwargs):
-        HTTPSConnectionPool.__init__(self, *args, **kwargs)
-        self.connections = []
 
+class AsyncHTTPSConnectionPool(AsyncPoolMixin, HTTPSConnectionPool):
     def _new_conn(self):
         """
         Return a fresh :class:`httplib.HTTPSConnection`.
@@ -239,18 +322,12 @@ class AsyncHTTPSConnectionPool(HTTPSConnectionPool):
             extra_params['strict'] = self.strict
         connection = connection_class(host=actual_host, port=actual_port, timeout=self.timeout.connect_timeout, **extra_params)
 
-        self.connections.append(connection)
-
         try:
             return self._prepare_conn(connection)
         except AttributeError:
             # urllib3 2.1.0
             return connection
 
-    def cancel(self):
-        for c in self.connections:
-            c.cancel()
-
 
 pool_classes_by_scheme = {
     'http': AsyncHTTPConnectionPool,
@@ -277,11 +354,243 @@ class AsyncPoolManager(PoolManager):
         return pool_cls(host, port, **kwargs)
 
 
+class PoolStats(object):
+    __slots__ = ("handshakes", "requests", "since")
+
+    def __init__(self):
+        self.reset()
+
+    def reset(self):
+        self.handshakes = 0
+        self.requests = 0
+        self.since = time.time()
+
+    def __repr__(self):
+        minutes = max(time.time() - self.since, 1) / 60.0
+        return '<PoolStats requests={0} handshakes={1} ({2:.1f}/min)>'.format(self.requests, self.handshakes,
+                                                                              self.handshakes / minutes)
+
+
+class PoolRegistry(object):
+    """
+    Process-wide registry of keep-alive connection pools, keyed by (scheme, host, port) by the underlying
+    PoolManager, shared by every Session.
+    """
+    def __init__(self, num_pools=10, maxsize=10):
+        self.numPools = num_pools
+        self.maxsize = maxsize
+        self.stats = PoolStats()
+        self._manager = None
+        self._lock = threading.Lock()
+
+    @property
+    def manager(self):
+        if not self._manager:
+            with self._lock:
+                if not self._manager:
+                    self._manager = AsyncPoolManager(num_pools=self.numPools, maxsize=self.maxsize,
+                                                     block=DEFAULT_POOLBLOCK)
+        return self._manager
+
+    def clear(self):
+        with self._lock:
+            if self._manager:
+                self._manager.clear()
+
+
+POOLS = PoolRegistry()
+
+
+class TransferStats(object):
+    """
+    Bytes received on the wire vs. bytes after content decoding, summed over all responses.
+    """
+    def __init__(self):
+        self.responses = 0
+        self.wire = 0
+        self.decoded = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<TransferStats responses={0} wire={1:.1f}MB decoded={2:.1f}MB ratio={3:.1f}x>'.format(
+            self.responses, self.wire / 1048576.0, self.decoded / 1048576.0, self.wire and float(self.decoded) / self.wire or 0
+        )
+
+    def record(self, response, decoded=None):
+        raw = response.raw
+        if decoded is None:
+            decoded = len(response._content or b'')
+        wire = raw.tell() if hasattr(raw, "tell") else decoded
+
+        with self._lock:
+            self.responses += 1
+            self.wire += wire
+            self.decoded += decoded
+
+        util.DEBUG_LOG('Transfer: {0} bytes on wire, {1} decoded ({2})', wire, decoded,
+                       response.headers.get('Content-Encoding', 'identity'))
+
+
+TRANSFERS = TransferStats()
+
+
+class CancelStats(object):
+    """
+    Work canceled through CancelTokens while it had requests in flight, and the response bytes it didn't download.
+    """
+    def __init__(self):
+        self.canceled = 0
+        self.connections = 0
+        self.bytesSaved = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<CancelStats canceled={0} connections={1} saved={2:.1f}MB>'.format(
+            self.canceled, self.connections, self.bytesSaved / 1048576.0
+        )
+
+    def record(self, connections, saved):
+        with self._lock:
+            self.canceled += 1
+            self.connections += connections
+            self.bytesSaved += saved
+
+
+CANCELS = CancelStats()
+
+
+def _remainingBytes(response):
+    if response._content_consumed:
+        return 0
+
+    try:
+        length = int(response.headers.get('Content-Length'))
+    except (TypeError, ValueError):
+        # chunked; whatever is left is unknown
+        return 0
+
+    raw = response.raw
+    return max(length - (raw.tell() if hasattr(raw, "tell") else 0), 0)
+
+
+class CancelToken(object):
+    """
+    Cancellation handle of a unit of work, e.g. a background task. While it's active on a thread (as a context
+    manager), the connections checked out and the streamed responses received there are attached to it; canceling it
+    aborts them, so a blocked connect or read returns right away and the connection isn't reused.
+    """
+    def __init__(self):
+        self.canceled = False
+        self._connections = set()
+        self._responses = []
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def __enter__(self):
+        self._previous = currentToken()
+        _TOKEN.token = self
+        return self
+
+    def __exit__(self, *exc):
+        _TOKEN.token = self._previous
+        self._previous = None
+        with self._lock:
+            for conn in self._connections:
+                conn._token = None
+            self._connections.clear()
+            del self._responses[:]
+
+    def attach(self, conn):
+        with self._lock:
+            if self.canceled:
+                conn.abort()
+                return
+            conn._token = self
+            self._connections.add(conn)
+
+    def detach(self, conn):
+        with self._lock:
+            conn._token = None
+            self._connections.discard(conn)
+
+    def track(self, response):
+        with self._lock:
+            if not self.canceled:
+                self._responses.append(response)
+
+    def cancel(self):
+        with self._lock:
+            if self.canceled:
+                return
+            self.canceled = True
+            connections = list(self._connections)
+            responses = self._responses
+            self._responses = []
+
+        if not connections:
+            return
+
+        saved = sum(_remainingBytes(r) for r in responses)
+        for conn in connections:
+            conn.abort()
+
+        CANCELS.record(len(connections), saved)
+        util.DEBUG_LOG('Canceled: aborted {0} connection(s), {1} bytes not downloaded', len(connections), saved)
+
+
+class CountingReader(object):
+    """
+    File-like wrapper around a streamed response body counting the decoded bytes read from it. Reads failing because
+    the body's CancelToken was canceled raise CanceledException.
+    """
+    def __init__(self, source):
+        self.source = source
+        self.count = 0
+        self.token = currentToken()
+
+    def read(self, size=-1):
+        try:
+            data = self.source.read(size)
+        except Exception:
+            if self.token is not None and self.token.canceled:
+                raise CanceledException('Request canceled')
+            raise
+        self.count += len(data)
+        return data
+
+    def close(self):
+        self.source.close()
+
+
 class AsyncHTTPAdapter(HTTPAdapter):
+    def claim(self, conn):
+        conn._owner = self
+        self.connections.append(conn)
+
+    def release(self, conn):
+        conn._owner = None
+        try:
+            self.connections.remove(conn)
+        except ValueError:
+            pass
+
     def cancel(self):
-        for c in self.connections:
+        for c in list(self.connections):
             c.cancel()
 
+    def close(self):
+        # the pool manager is shared; only drop our own proxy pools
+        for proxy in self.proxy_manager.values():
+            proxy.clear()
+
+    def send(self, request, **kwargs):
+        POOLS.stats.requests += 1
+        _OWNER.adapter = self
+        try:
+            return HTTPAdapter.send(self, request, **kwargs)
+        finally:
+            _OWNER.adapter = None
+
     def init_poolmanager(self, connections, maxsize, block=DEFAULT_POOLBLOCK):
         """Initializes a urllib3 PoolManager. This method should not be called
         from user code, and is only exposed for use when subclassing the
@@ -296,7 +605,7 @@ class AsyncHTTPAdapter(HTTPAdapter):
         self._pool_maxsize = maxsize
         self._pool_block = block
 
-        self.poolmanager = AsyncPoolManager(num_pools=connections, maxsize=maxsize, block=block)
+        self.poolmanager = POOLS.manager
         self.connections = []
 
     def get_connection(self, url, proxies=None):
@@ -329,7 +638,6 @@ class AsyncHTTPAdapter(HTTPAdapter):
             url = parsed.geturl()
             conn = self.poolmanager.connection_from_url(url)
 
-        self.connections.append(conn)
         return conn
 
 
@@ -339,6 +647,26 @@ class Session(requests.Session):
         self.mount('https://', AsyncHTTPAdapter())
         self.mount('http://', AsyncHTTPAdapter())
 
+    def send(self, request, **kwargs):
+        token = currentToken()
+        if token is not None and token.canceled:
+            raise CanceledException('Request canceled')
+
+        try:
+            response = requests.Session.send(self, request, **kwargs)
+        except Exception:
+            # an aborted connection surfaces as whatever error the interrupted connect/read raised
+            if token is not None and token.canceled:
+                raise CanceledException('Request canceled')
+            raise
+
+        # streamed bodies are accounted for by whoever consumes them
+        if not kwargs.get("stream"):
+            TRANSFERS.record(response)
+        elif token is not None:
+            token.track(response)
+        return response
+
     def cancel(self):
         for v in self.adapters.values():
             v.close()
@@ -18,7 +18,7 @@ class Audio(media.MediaItem):
 
     def _setData(self, data):
         for k, v in data.attrib.items():
-            setattr(self, k, plexobjects.PlexValue(v, self))
+            setattr(self, k, plexobjects.plexValue(k, v, self))
 
         self.key = plexobjects.PlexValue(self.key.replace('/children', ''), self)
 
@@ -153,8 +153,8 @@ class Track(Audio):
 
     @property
     def defaultThumb(self):
-        return self.__dict__.get('thumb') or self.__dict__.get('parentThumb') or self.get('grandparentThumb')
+        return self.get('thumb') or self.get('parentThumb') or self.get('grandparentThumb')
 
     @property
     def defaultArt(self):
-        return self.__dict__.get('art') or self.get('grandparentArt')
+        return self.get('art') or self.get('grandparentArt')
@@ -6,6 +6,7 @@ import traceback
 import requests
 import socket
 import urllib3
+from urllib3.util.request import ACCEPT_ENCODING
 from . import threadutils
 import six.moves.urllib.request, six.moves.urllib.parse, six.moves.urllib.error
 import mimetypes
@@ -25,6 +26,12 @@ DEFAULT_TIMEOUT = asyncadapter.AsyncTimeout(util.TIMEOUT).setConnectTimeout(util
 
 RESOLVED_PD_HOSTS = {}
 
+# async requests run on a bounded set of long-lived threads instead of one thread per request
+ASYNC_POOL = threadutils.WorkerPool('HTTP-ASYNC', max_workers=8)
+# reachability tests fan out over every connection of every server and can each wait out a long connect timeout;
+# kept off ASYNC_POOL so they neither queue behind each other nor hold up other requests
+PROBE_POOL = threadutils.WorkerPool('HTTP-PROBE', max_workers=64, idle_timeout=30)
+
 _getaddrinfo = socket.getaddrinfo
 
 
@@ -52,17 +59,24 @@ def pgetaddrinfo(host, port, *args, **kwargs):
 socket.getaddrinfo = pgetaddrinfo
 
 
+def baseHeaders():
+    # BASE_HEADERS may be replaced wholesale by the app, make sure compressed transfers are always negotiated
+    headers = util.BASE_HEADERS.copy()
+    headers.setdefault('Accept-Encoding', ACCEPT_ENCODING)
+    return headers
+
+
 def GET(*args, **kwargs):
-    return requests.get(*args, headers=util.BASE_HEADERS.copy(), timeout=util.TIMEOUT, **kwargs)
+    return requests.get(*args, headers=baseHeaders(), timeout=util.TIMEOUT, **kwargs)
 
 
 def POST(*args, **kwargs):
-    return requests.post(*args, headers=util.BASE_HEADERS.copy(), timeout=util.TIMEOUT, **kwargs)
+    return requests.post(*args, headers=baseHeaders(), timeout=util.TIMEOUT, **kwargs)
 
 
 def Session():
     s = asyncadapter.Session()
-    s.headers = util.BASE_HEADERS.copy()
+    s.headers = baseHeaders()
     s.timeout = util.TIMEOUT
 
     return s
@@ -78,7 +92,7 @@ class RequestContext(dict):
 
 class HttpRequest(object):
     __slots__ = ("server", "path", "hasParams", "ignoreResponse", "session", "currentResponse", "method", "url",
-                 "thread", "__dict__")
+                 "__dict__")
     _cancel = False
 
     def __init__(self, url, method=None, forceCertificate=False):
@@ -87,11 +101,10 @@ class HttpRequest(object):
         self.hasParams = '?' in url
         self.ignoreResponse = False
         self.session = asyncadapter.Session()
-        self.session.headers = util.BASE_HEADERS.copy()
+        self.session.headers = baseHeaders()
         self.currentResponse = None
         self.method = method
         self.url = url
-        self.thread = None
 
         # Use our specific plex.direct CA cert if applicable to improve performance
         # if forceCertificate or url[:5] == "https":  # TODO: ---------------------------------------------------------------------------------IMPLEMENT
@@ -106,9 +119,9 @@ class HttpRequest(object):
         util.APP.delRequest(self)
 
     def startAsync(self, *args, **kwargs):
-        self.thread = threadutils.KillableThread(target=self._startAsync, args=args, kwargs=kwargs, name='HTTP-ASYNC:{0}'.format(self.url))
-        self.thread.start()
-        return True
+        context = kwargs.get("context")
+        pool = context and context.requestType == "reachability" and PROBE_POOL or ASYNC_POOL
+        return pool.submit(self._startAsync, *args, **kwargs)
 
     def _startAsync(self, body=None, contentType=None, context=None):
         timeout = context and context.timeout or DEFAULT_TIMEOUT
@@ -347,6 +360,17 @@ class HttpObjectResponse(HttpResponse, plexobjects.PlexContainer):
         self.items = plexobjects.listItems(server, path, data=data, container=self)
 
 
+def logPoolStats():
+    util.DEBUG_LOG("HTTP: {0}, {1}, {2}, {3}, {4}", asyncadapter.POOLS.stats, asyncadapter.TRANSFERS,
+                   asyncadapter.CANCELS, ASYNC_POOL, PROBE_POOL)
+
+
+def closePools():
+    ASYNC_POOL.shutdown()
+    PROBE_POOL.shutdown()
+    asyncadapter.POOLS.clear()
+
+
 def addRequestHeaders(transferObj, headers=None):
     if isinstance(headers, dict):
         for header in headers:
@@ -141,6 +141,7 @@ class NowPlayingManager(object):
 
         context = request.createRequestContext("timelineUpdate", callback.Callable(self.onTimelineResponse))
         context.playQueue = timeline.playQueue
+        context.state = timeline.state
         util.APP.startRequest(request, context)
 
     def getServerTimeline(self, timelineType):
@@ -158,6 +159,9 @@ class NowPlayingManager(object):
     def onTimelineResponse(self, request, response, context):
         context.request.server.trigger("np:timelineResponse", response=response)
 
+        if context.state == "stopped":
+            context.request.server.invalidateResponseCache('playback stopped')
+
         if not context.playQueue or not context.playQueue.refreshOnTimeline:
             return
         context.playQueue.refreshOnTimeline = False
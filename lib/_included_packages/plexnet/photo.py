@@ -26,11 +26,13 @@ class Photo(media.MediaItem):
     def markWatched(self):
         path = '/:/scrobble?key=%s&identifier=com.plexapp.plugins.library' % self.ratingKey
         self.server.query(path)
+        self.server.invalidateResponseCache('watched state')
         self.reload()
 
     def markUnwatched(self):
         path = '/:/unscrobble?key=%s&identifier=com.plexapp.plugins.library' % self.ratingKey
         self.server.query(path)
+        self.server.invalidateResponseCache('watched state')
         self.reload()
 
     def play(self, client):
@@ -121,6 +121,17 @@ class App(signalsmixin.SignalsMixin):
             util.DEBUG_LOG('Closing server...')
             SERVERMANAGER.selectedServer.close()
 
+        http.logPoolStats()
+        http.closePools()
+
+        from . import plexobjects
+        from . import plexserver
+        util.DEBUG_LOG('{0}', plexobjects.DATETIME_CACHE)
+        util.DEBUG_LOG('{0}', plexobjects.RELOAD_BATCHER)
+        util.DEBUG_LOG('{0}', plexserver.QUERY_FLIGHTS)
+        util.DEBUG_LOG('{0}', plexserver.RESPONSE_CACHE)
+        util.DEBUG_LOG('{0}', plexserver.CONDITIONAL_CACHE)
+
     def shutdown(self):
         if self.timers:
             util.DEBUG_LOG('Waiting for {0} App() timers: Started', len(self.timers))
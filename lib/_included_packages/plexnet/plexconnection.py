@@ -40,6 +40,47 @@ class ConnectionSource(int):
         return self.name
 
 
+class TransferEstimate(object):
+    """
+    Rolling (exponentially weighted) estimate of a connection's request latency and body throughput.
+    """
+    WEIGHT = 0.3
+
+    def __init__(self):
+        self.latency = None
+        self.throughput = None
+        self.samples = 0
+
+    def __repr__(self):
+        return '<TransferEstimate latency={0} throughput={1} samples={2}>'.format(
+            self.latency is not None and '{0:.0f}ms'.format(self.latency * 1000) or '-',
+            self.throughput is not None and '{0:.0f}KB/s'.format(self.throughput / 1024.0) or '-',
+            self.samples
+        )
+
+    def _avg(self, old, new):
+        return new if old is None else old + self.WEIGHT * (new - old)
+
+    def record(self, latency, size, seconds):
+        """
+        latency: seconds until the response headers arrived
+        size: decoded body size in bytes
+        seconds: total time including reading the body
+        """
+        self.samples += 1
+        self.latency = self._avg(self.latency, latency)
+
+        # tiny bodies say nothing about bandwidth
+        transfer = seconds - latency
+        if size >= 16384 and transfer > 0:
+            self.throughput = self._avg(self.throughput, size / transfer)
+
+    def expectedTime(self, size):
+        if self.latency is None or self.throughput is None:
+            return None
+        return self.latency + size / self.throughput
+
+
 class PlexConnection(object):
     # Constants
     STATE_UNKNOWN = "unknown"
@@ -84,6 +125,7 @@ class PlexConnection(object):
 
         self.lastTestedAt = 0
         self.hasPendingRequest = False
+        self.transfers = TransferEstimate()
 
         self.isSecureButLocal = False
 
@@ -3,9 +3,11 @@ from datetime import datetime
 
 from . import exceptions
 from . import util
+from . import asyncadapter
 import json
 import six
 import time
+import threading
 
 # Search Types - Plex uses these to filter specific media types when searching.
 SEARCHTYPES = {
@@ -20,6 +22,19 @@ SEARCHTYPES = {
 
 LIBRARY_TYPES = {}
 
+# Keep the XML attributes of PlexObjects around and only wrap them in PlexValues when they're first accessed
+LAZY_ATTRIBUTES = True
+
+_CLASS_ATTRIBUTES = {}
+
+
+def _classAttributes(cls):
+    # names that would shadow (or be shadowed by) instance attributes and thus can't be resolved lazily
+    names = _CLASS_ATTRIBUTES.get(cls)
+    if names is None:
+        names = _CLASS_ATTRIBUTES[cls] = frozenset(dir(cls))
+    return names
+
 
 def registerLibType(cls):
     LIBRARY_TYPES[cls.TYPE] = cls
@@ -33,6 +48,42 @@ def registerLibFactory(ftype):
     return wrap
 
 
+class ConversionCache(object):
+    """
+    Bounded cache for parsed PlexValue conversions; keys must be plain strings (not PlexValues, to not keep their
+    parents alive)
+    """
+    def __init__(self, name, maxsize=4096):
+        self.name = name
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._cache = {}
+
+    def __repr__(self):
+        total = self.hits + self.misses
+        return '<ConversionCache {0} size={1} hits={2} misses={3} hit rate={4:.1f}%>'.format(
+            self.name, len(self._cache), self.hits, self.misses, total and self.hits * 100.0 / total or 0
+        )
+
+    def get(self, key):
+        ret = self._cache.get(key)
+        if ret is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return ret
+
+    def set(self, key, value):
+        if len(self._cache) >= self.maxsize:
+            self._cache.clear()
+        self._cache[key] = value
+        return value
+
+
+DATETIME_CACHE = ConversionCache('asDatetime')
+
+
 class PlexValue(six.text_type):
     __slots__ = ("parent", "NA")
 
@@ -64,6 +115,13 @@ class PlexValue(six.text_type):
         if not self:
             return None
 
+        key = (six.text_type(self), format_)
+        ret = DATETIME_CACHE.get(key)
+        if ret is None:
+            ret = DATETIME_CACHE.set(key, self._asDatetime(format_))
+        return ret
+
+    def _asDatetime(self, format_=None):
         if self.isdigit():
             dt = datetime.fromtimestamp(int(self))
         else:
@@ -89,6 +147,39 @@ class PlexValue(six.text_type):
         return self.parent.server.getImageTranscodeURL(self, w, h, **extras)
 
 
+# Low-cardinality attributes whose values are shared between all objects instead of allocating a PlexValue per
+# object. Interned values have no parent, so URL-ish attributes must never be listed here.
+INTERNED_ATTRIBUTES = frozenset((
+    'type', 'subtype', 'librarySectionID', 'librarySectionKey', 'librarySectionTitle', 'librarySectionUUID',
+    'contentRating', 'studio', 'year', 'index', 'parentIndex', 'viewCount', 'skipCount', 'leafCount',
+    'viewedLeafCount', 'childCount', 'container', 'attrib_container', 'videoResolution', 'videoCodec',
+    'videoProfile', 'videoFrameRate', 'audioCodec', 'audioProfile', 'audioChannels', 'aspectRatio', 'protocol',
+    'optimizedForStreaming', 'has64bitOffsets', 'hasVoiceActivity', 'streamType', 'codec', 'profile', 'language',
+    'languageCode', 'languageTag', 'selected', 'default', 'forced', 'channels', 'audioChannelLayout', 'bitDepth',
+    'chromaLocation', 'chromaSubsampling', 'colorPrimaries', 'colorRange', 'colorSpace', 'colorTrc', 'frameRate',
+    'scanType', 'level', 'refFrames', 'samplingRate', 'decision', 'location', 'accessible', 'exists',
+))
+INTERNED_MAX = 8192
+
+_INTERNED = {}
+
+
+def plexValue(attr, value, parent):
+    """
+    Return a PlexValue for an XML attribute; values of INTERNED_ATTRIBUTES are shared
+    """
+    if attr not in INTERNED_ATTRIBUTES:
+        return PlexValue(value, parent)
+
+    key = (attr, value)
+    pv = _INTERNED.get(key)
+    if pv is None:
+        pv = PlexValue(value)
+        if len(_INTERNED) < INTERNED_MAX:
+            pv = _INTERNED.setdefault(key, pv)
+    return pv
+
+
 class JEncoder(json.JSONEncoder):
     def default(self, o):
         try:
@@ -155,9 +246,11 @@ class Checks(object):
 
 
 class PlexObject(Checks):
-    __slots__ = ("initpath", "key", "server", "container", "mediaChoice", "titleSort", "deleted", "_reloaded", "data")
+    __slots__ = ("initpath", "key", "server", "container", "mediaChoice", "titleSort", "deleted", "_reloaded", "data",
+                 "_attrib")
 
     def __init__(self, data, initpath=None, server=None, container=None):
+        self._attrib = None
         self.initpath = initpath
         self.key = None
         self.server = server
@@ -180,13 +273,62 @@ class PlexObject(Checks):
             return
 
         self.name = data.tag
+
+        if not LAZY_ATTRIBUTES:
+            for k, v in data.attrib.items():
+                if k in ("container",):
+                    k = "attrib_%s" % k
+
+                setattr(self, k, plexValue(k, v, self))
+            return
+
+        attrib = data.attrib
+        if getattr(self, "_attrib", None):
+            # reload: attributes missing from the new data keep their previous value
+            attrib = dict(self._attrib)
+            attrib.update(data.attrib)
+        self._attrib = attrib
+
+        # values we've already set or looked up, and names we can't resolve lazily, are replaced right away
+        classAttributes = _classAttributes(self.__class__)
+        d = self.__dict__
         for k, v in data.attrib.items():
             if k in ("container",):
                 k = "attrib_%s" % k
 
-            setattr(self, k, PlexValue(v, self))
+            if k in d or k in classAttributes:
+                setattr(self, k, plexValue(k, v, self))
+
+    def _materialize(self, attr):
+        attrib = getattr(self, "_attrib", None)
+        if not attrib:
+            return None
+
+        v = attrib.get(attr == "attrib_container" and "container" or attr)
+        if v is None or attr == "container":
+            return None
+
+        value = plexValue(attr, v, self)
+        setattr(self, attr, value)
+        return value
+
+    def _materializeAll(self):
+        if not getattr(self, "_attrib", None):
+            return
+
+        for k in self._attrib:
+            k = k == "container" and "attrib_container" or k
+            if k not in self.__dict__ and k not in _classAttributes(self.__class__):
+                self._materialize(k)
 
     def __getattr__(self, attr):
+        if attr == "_attrib":
+            raise AttributeError(attr)
+
+        a = self._materialize(attr)
+        if a is not None:
+            return a
+
         a = PlexValue('', self)
         a.NA = True
 
@@ -203,6 +345,8 @@ class PlexObject(Checks):
 
     def get(self, attr, default=''):
         ret = self.__dict__.get(attr, getattr(self, attr) if attr in self.__slots__ else None)
+        if ret is None:
+            ret = self._materialize(attr)
         return ret is not None and ret or PlexValue(default, self)
 
     def set(self, attr, value):
@@ -223,11 +367,11 @@ class PlexObject(Checks):
 
     @property
     def defaultThumb(self):
-        return self.__dict__.get('thumb') and self.thumb or PlexValue('', self)
+        return self.get('thumb')
 
     @property
     def defaultArt(self):
-        return self.__dict__.get('art') and self.art or PlexValue('', self)
+        return self.get('art')
 
     def refresh(self):
         import requests
@@ -239,7 +383,9 @@ class PlexObject(Checks):
             return self
 
         try:
-            if self.get('ratingKey'):
+            if self.get('ratingKey') and BATCH_RELOADS and RELOAD_BATCHER.reload(self, **kwargs):
+                return self
+            elif self.get('ratingKey'):
                 data = self.server.query('/library/metadata/{0}'.format(self.ratingKey), params=kwargs)
             else:
                 data = self.server.query(self.key, params=kwargs)
@@ -410,6 +556,7 @@ class PlexObject(Checks):
         import json
         odict = {}
         if full:
+            self._materializeAll()
             for k, v in self.__dict__.items():
                 if k not in ('server', 'container', 'media', 'initpath', '_data') and v:
                     odict[k] = v
@@ -560,7 +707,11 @@ class ItemContainer(list):
 
 def listItems(server, path, libtype=None, watched=None, bytag=False, data=None, container=None, offset=None,
               limit=None, tag_fallback=False, **kwargs):
-    data = data if data is not None else server.query(path, offset=offset, limit=limit, **kwargs)
+    if data is None:
+        if getattr(server, 'SUPPORTS_ITERPARSE', False):
+            # build the items while the response is still being parsed
+            kwargs["iterparse"] = True
+        data = server.query(path, offset=offset, limit=limit, **kwargs)
     container = container or PlexContainer(data, path, server, path)
     items = ItemContainer().init(container)
 
@@ -577,9 +728,151 @@ def listItems(server, path, libtype=None, watched=None, bytag=False, data=None,
             except exceptions.UnknownType:
                 pass
 
+        if getattr(data, 'failed', False):
+            # the streamed response broke off; don't pass what arrived off as the whole list
+            return ItemContainer().init(container)
+
+    return items
+
+
+# Coalesce concurrent PlexObject.reload calls into batched /library/metadata requests
+BATCH_RELOADS = True
+BATCH_RELOAD_SIZE = 50
+
+
+def reloadItems(items, **kwargs):
+    """
+    Reload many items with one /library/metadata/<key,key,...> request per server and BATCH_RELOAD_SIZE items,
+    handing each returned element to the matching objects' _setData. Items without a ratingKey are reloaded singly.
+    """
+    groups = {}
+    for item in items:
+        if not item.get('ratingKey'):
+            item.reload(**kwargs)
+            continue
+        groups.setdefault(id(item.server), []).append(item)
+
+    for group in groups.values():
+        _reloadGroup(group, **kwargs)
+
     return items
 
 
+def _reloadGroup(group, **kwargs):
+    """
+    Batched reload of items of one server that all have a ratingKey. Returns the ones data was returned for.
+    """
+    server = group[0].server
+    loaded = []
+    for i in range(0, len(group), BATCH_RELOAD_SIZE):
+        chunk = group[i:i + BATCH_RELOAD_SIZE]
+        byKey = {}
+        for item in chunk:
+            byKey.setdefault(six.text_type(item.ratingKey), []).append(item)
+
+        data = server.query('/library/metadata/{0}'.format(','.join(byKey)), params=kwargs)
+        for elem in data if data is not None else ():
+            for item in byKey.pop(elem.attrib.get('ratingKey'), ()):
+                item._setData(elem)
+                item._reloaded = True
+                loaded.append(item)
+
+        for item in chunk:
+            item.initpath = item.key
+
+        for key in byKey:
+            util.DEBUG_LOG('No data on batched reload: {0}', key)
+
+    return loaded
+
+
+class _ReloadBatch(object):
+    __slots__ = ("items", "loaded", "full", "done", "error")
+
+    def __init__(self):
+        self.items = []
+        self.loaded = set()
+        self.full = threading.Event()
+        self.done = threading.Event()
+        self.error = None
+
+
+class ReloadBatcher(object):
+    """
+    Collects single-item reloads issued by concurrent threads for the same server and parameters. A reload with no
+    other one in flight is sent right away; while one is, the first caller waits up to window seconds (or until
+    max_items are queued), then reloads the whole batch while the others wait for it.
+
+    reload() returns whether the item was taken care of. It's False for an item the batch brought no data for (the
+    leader's request failed or was canceled) while the caller's own work wasn't canceled, so it can reload the item
+    by itself.
+    """
+    def __init__(self, window=0.05, max_items=BATCH_RELOAD_SIZE):
+        self.window = window
+        self.maxItems = max_items
+        self.batches = 0
+        self.reloads = 0
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._inflight = {}
+
+    def __repr__(self):
+        return '<ReloadBatcher reloads={0} requests={1}>'.format(self.reloads, self.batches)
+
+    def reload(self, item, **kwargs):
+        key = (id(item.server), tuple(sorted(kwargs.items())))
+        with self._lock:
+            self.reloads += 1
+            batch = self._pending.get(key)
+            leader = batch is None
+            if leader:
+                batch = self._pending[key] = _ReloadBatch()
+                # nothing to collect a batch from unless other reloads are underway
+                wait = self._inflight.get(key, 0) > 0
+            batch.items.append(item)
+            if len(batch.items) >= self.maxItems:
+                del self._pending[key]
+                batch.full.set()
+
+        if not leader:
+            batch.done.wait()
+        else:
+            if wait:
+                batch.full.wait(self.window)
+            with self._lock:
+                if self._pending.get(key) is batch:
+                    del self._pending[key]
+                self._inflight[key] = self._inflight.get(key, 0) + 1
+                self.batches += 1
+
+            try:
+                batch.loaded = set(id(i) for i in _reloadGroup(batch.items, **kwargs))
+            except Exception as e:
+                batch.error = e
+            finally:
+                with self._lock:
+                    self._inflight[key] -= 1
+                    if not self._inflight[key]:
+                        del self._inflight[key]
+                batch.done.set()
+
+        if batch.error is not None:
+            raise batch.error
+
+        if leader or id(item) in batch.loaded:
+            return True
+
+        token = asyncadapter.currentToken()
+        if token is not None and token.canceled:
+            return True
+
+        util.DEBUG_LOG('No data for {0} on batched reload, reloading it by itself', item)
+        return False
+
+
+RELOAD_BATCHER = ReloadBatcher()
+
+
 def searchType(libtype):
     searchtypesstrs = [str(k) for k in SEARCHTYPES.keys()]
     if libtype in SEARCHTYPES + searchtypesstrs:
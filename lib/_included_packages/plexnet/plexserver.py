@@ -17,6 +17,9 @@ from . import plexobjects
 from . import plexresource
 from . import plexlibrary
 from . import asyncadapter
+from . import threadutils
+from . import responsecache
+from .responsecache import RESPONSE_CACHE, CONDITIONAL_CACHE
 from six.moves import range
 # from plexapi.client import Client
 # from plexapi.playqueue import PlayQueue
@@ -24,10 +27,92 @@ from six.moves import range
 
 TOTAL_QUERIES = 0
 DEFAULT_BASEURI = 'http://localhost:32400'
+QUERY_FLIGHTS = threadutils.SingleFlight('query')
+
+# a response body that broke off, timed out or couldn't be decoded while it was being read
+READ_ERRORS = (
+    http.requests.ConnectionError, http.requests.exceptions.ReadTimeout, http.requests.exceptions.ContentDecodingError,
+    urllib3.exceptions.ProtocolError, urllib3.exceptions.ReadTimeoutError, urllib3.exceptions.DecodeError
+)
+
+
+class IterparseElement(object):
+    """
+    Stand-in for the root Element of a streamed response. Children are parsed incrementally while iterating and
+    detached from the root once consumed, so the full tree is never held by the container itself.
+
+    onClose is called once with whether the source was read to the end. failed is set when the response broke off
+    while iterating, so the children seen so far aren't all there is.
+    """
+    __slots__ = ("tag", "attrib", "failed", "_source", "_onClose", "_events", "_root")
+
+    def __init__(self, source, onClose=None):
+        self._source = source
+        self._onClose = onClose
+        self._events = ElementTree.iterparse(source, events=('start', 'end'))
+        self._root = None
+        self.tag = None
+        self.attrib = {}
+        self.failed = False
+
+        try:
+            for event, elem in self._events:
+                self._root = elem
+                self.tag = elem.tag
+                self.attrib = elem.attrib
+                break
+        except:
+            self.close()
+            raise
+
+    def __bool__(self):
+        return self._root is not None
+
+    __nonzero__ = __bool__
+
+    def __iter__(self):
+        if self._root is None:
+            return
+
+        depth = 1
+        complete = False
+        try:
+            for event, elem in self._events:
+                if event == 'start':
+                    depth += 1
+                    continue
+
+                depth -= 1
+                if depth == 1:
+                    yield elem
+                    self._root.remove(elem)
+            complete = True
+        except asyncadapter.CanceledException:
+            self.failed = True
+            util.DEBUG_LOG('Streamed response canceled')
+        except READ_ERRORS + (ElementTree.ParseError,):
+            self.failed = True
+            util.ERROR()
+        finally:
+            self.close(complete)
+
+    def get(self, key, default=None):
+        return self.attrib.get(key, default)
+
+    def find(self, path):
+        return None
+
+    def close(self, complete=False):
+        self._events = ()
+        self._source.close()
+        if self._onClose:
+            self._onClose(complete)
+            self._onClose = None
 
 
 class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
     TYPE = 'PLEXSERVER'
+    SUPPORTS_ITERPARSE = True
 
     def __init__(self, data=None):
         signalsmixin.SignalsMixin.__init__(self)
@@ -224,7 +309,13 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
             util.WARN_LOG("Server connection is None, returning an empty url")
             return ""
 
-    def query(self, path, method=None, **kwargs):
+    def query(self, path, method=None, iterparse=False, **kwargs):
+        """
+        iterparse: stream the response and return an IterparseElement whose children are parsed while iterating,
+                   instead of a fully built tree (GET only)
+        """
+        isGet = not method
+        iterparse = iterparse and isGet
         method = method or self.session.get
 
         limit = kwargs.pop("limit", None)
@@ -237,7 +328,6 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
         offset = kwargs.pop("offset", None)
         if kwargs:
             path += util.joinArgs(kwargs, '?' not in path)
-            kwargs.clear()
 
         url = self.buildUrl(path, includeToken=True)
 
@@ -254,25 +344,121 @@ class PlexServer(plexresource.PlexResource, signalsmixin.SignalsMixin):
             url = http.addUrlParam(url, "X-Plex-Container-Start=%s" % offset)
             url = http.addUrlParam(url, "X-Plex-Container-Size=%s" % limit)
 
+        # cacheable responses are small and fetched whole, so the body can be kept
+        ttl = isGet and RESPONSE_CACHE.enabled and RESPONSE_CACHE.ttl(path) or 0
+        if ttl:
+            iterparse = False
+            data = RESPONSE_CACHE.get(self.uuid, url)
+            if data is not None:
+                util.DEBUG_LOG('CACHED {0}', re.sub('X-Plex-Token=[^&]+', 'X-Plex-Token=****', url))
+                return ElementTree.fromstring(data)
+
         util.LOG('{0} {1}', method.__name__.upper(), re.sub('X-Plex-Token=[^&]+', 'X-Plex-Token=****', url))
+
+        conditional = isGet and CONDITIONAL_CACHE.enabled and CONDITIONAL_CACHE.handles(path)
+
+        # streamed results are consumed once, so only plain GETs share an in-flight request and its parsed tree
+        if isGet and not iterparse:
+            try:
+                return QUERY_FLIGHTS.do(url, self._fetch, url, method, ttl=ttl, conditional=conditional, shared=True)
+            except asyncadapter.CanceledException:
+                token = asyncadapter.currentToken()
+                if token is not None and token.canceled:
+                    return None
+                # we were waiting on a request of a task that got canceled
+                return self._fetch(url, method, ttl=ttl, conditional=conditional)
+        return self._fetch(url, method, iterparse, conditional=conditional)
+
+    def invalidateResponseCache(self, reason=None):
+        RESPONSE_CACHE.invalidate(self.uuid, reason)
+
+    def _fetch(self, url, method, iterparse=False, ttl=0, conditional=False, shared=False):
+        kwargs = {}
+        cached = None
         try:
+            if conditional:
+                cached = CONDITIONAL_CACHE.open(self.uuid, url)
+                if cached:
+                    kwargs["headers"] = cached.headers
+
+            if iterparse:
+                kwargs["stream"] = True
+
+            start = time.time()
+            connection = self.activeConnection
             response = method(url, **kwargs)
-            if response.status_code not in (200, 201):
+            if response.status_code == 304 and cached:
+                response.close()
+                CONDITIONAL_CACHE.reused(cached)
+                util.DEBUG_LOG('Not modified, reusing {0} stored bytes', cached.size)
+                if iterparse:
+                    source, cached = cached.file, None
+                    return self._iterparse(source)
+                data = cached.read()
+
+            elif response.status_code not in (200, 201):
+                response.close()
                 codename = http.status_codes.get(response.status_code, ['Unknown'])[0]
                 raise exceptions.BadRequest('({0}) {1}'.format(response.status_code, codename))
-            data = response.text.encode('utf8')
+
+            else:
+                writer = conditional and CONDITIONAL_CACHE.writer(self.uuid, url, response.headers)
+                if iterparse:
+                    # urllib3 decodes gzip/deflate chunk by chunk, so the parser is fed decompressed data as it arrives
+                    response.raw.decode_content = True
+                    source = asyncadapter.CountingReader(response.raw)
+
+                    def onClose(complete):
+                        response.close()
+                        asyncadapter.TRANSFERS.record(response, source.count)
+                        if complete and connection:
+                            connection.transfers.record(response.elapsed.total_seconds(), source.count,
+                                                        time.time() - start)
+                        if writer and complete:
+                            writer.commit()
+                        elif writer:
+                            writer.discard()
+
+                    return self._iterparse(writer and responsecache.TeeReader(source, writer) or source, onClose)
+
+                data = response.text.encode('utf8')
+                if connection:
+                    connection.transfers.record(response.elapsed.total_seconds(), len(data), time.time() - start)
+                if writer:
+                    writer.write(data)
+                    writer.commit()
+                if ttl:
+                    RESPONSE_CACHE.set(self.uuid, url, data, ttl)
         except asyncadapter.TimeoutException:
             util.ERROR()
             util.MANAGER.refreshResources(True)
             return None
-        except (http.requests.ConnectionError, urllib3.exceptions.ProtocolError):
+        except READ_ERRORS:
             util.ERROR()
             return None
         except asyncadapter.CanceledException:
+            if shared:
+                raise
             return None
+        finally:
+            if cached:
+                cached.close()
 
         return ElementTree.fromstring(data) if data else None
 
+    def _iterparse(self, source, onClose=None):
+        try:
+            data = IterparseElement(source, onClose)
+        except ElementTree.ParseError as e:
+            # IterparseElement closed the source; an empty body is no result, like for a fully read response
+            if e.code == 3 and e.position == (1, 0):
+                return None
+            raise
+        if not data:
+            data.close()
+            return None
+        return data
+
     def getImageTranscodeURL(self, path, width, height, **extraOpts):
         if not path:
             return ''
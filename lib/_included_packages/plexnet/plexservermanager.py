@@ -5,6 +5,7 @@ from . import http
 from . import plexconnection
 from . import plexresource
 from . import plexserver
+from . import responsecache
 from . import signalsmixin
 from . import callback
 from . import plexapp
@@ -63,6 +64,7 @@ class PlexServerManager(signalsmixin.SignalsMixin):
         if not self.selectedServer or force:
             util.LOG("Setting selected server to {0}", server)
             self.selectedServer = server
+            responsecache.RESPONSE_CACHE.invalidate(reason='server change')
 
             # Update our saved state.
             self.saveState(setPreferred=True)
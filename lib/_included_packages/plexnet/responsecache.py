@@ -0,0 +1,285 @@
+from __future__ import absolute_import
+import os
+import re
+import json
+import time
+import hashlib
+import tempfile
+import threading
+from collections import OrderedDict
+
+from . import util
+
+
+# (path pattern, seconds) - the first match decides how long a response for a path stays fresh
+TTL_RULES = (
+    (re.compile(r'^/hubs(/|\?|$)'), 30),
+    (re.compile(r'^/library/sections/?(\?|$)'), 60),
+    (re.compile(r'^/library/metadata/\d+(\?|$)'), 15),
+)
+
+
+class ResponseCache(object):
+    """
+    Short-lived in-memory cache of raw GET response bodies, keyed by server and full URL (including the token, so
+    responses never leak across users). Least recently used entries are evicted once maxBytes is exceeded.
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024, rules=TTL_RULES):
+        self.maxBytes = max_bytes
+        self.rules = rules
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        total = self.hits + self.misses
+        return '<ResponseCache entries={0} bytes={1} hits={2} misses={3} evictions={4} ({5:.1f}% hit rate)>'.format(
+            len(self._entries), self.size, self.hits, self.misses, self.evictions,
+            total and self.hits * 100.0 / total or 0
+        )
+
+    @property
+    def enabled(self):
+        return util.INTERFACE.getPreference("response_cache", False)
+
+    def ttl(self, path):
+        for pattern, seconds in self.rules:
+            if pattern.match(path):
+                return seconds
+        return 0
+
+    def get(self, scope, url):
+        key = (scope, url)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry and entry[0] > time.time():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+
+            if entry:
+                self._remove(key)
+            self.misses += 1
+        return None
+
+    def set(self, scope, url, body, ttl):
+        if not body or len(body) > self.maxBytes:
+            return
+
+        key = (scope, url)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.time() + ttl, body)
+            self.size += len(body)
+            while self.size > self.maxBytes:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+
+    def _remove(self, key):
+        self.size -= len(self._entries.pop(key)[1])
+
+    def invalidate(self, scope=None, reason=None):
+        with self._lock:
+            if scope is None:
+                self._entries.clear()
+                self.size = 0
+            else:
+                for key in [k for k in self._entries if k[0] == scope]:
+                    self._remove(key)
+
+        util.DEBUG_LOG('Response cache invalidated ({0}): {1}', reason or 'manual', self)
+
+
+class CachedBody(object):
+    """
+    A stored response body, opened and positioned past its header line, together with the request headers needed to
+    revalidate it.
+    """
+    def __init__(self, filename, fileobj, meta):
+        self.filename = filename
+        self.file = fileobj
+        self.size = os.fstat(fileobj.fileno()).st_size - fileobj.tell()
+        self.headers = {}
+        if meta.get("etag"):
+            self.headers["If-None-Match"] = meta["etag"]
+        if meta.get("lastModified"):
+            self.headers["If-Modified-Since"] = meta["lastModified"]
+
+    def read(self):
+        try:
+            return self.file.read()
+        finally:
+            self.close()
+
+    def close(self):
+        self.file.close()
+
+
+class CacheWriter(object):
+    def __init__(self, cache, filename, meta):
+        self.cache = cache
+        self.filename = filename
+        fd, self.tmp = tempfile.mkstemp(dir=cache.path, suffix='.tmp')
+        self.file = os.fdopen(fd, 'wb')
+        self.file.write(json.dumps(meta).encode('utf8') + b'\n')
+
+    def write(self, data):
+        self.file.write(data)
+
+    def commit(self):
+        self.file.close()
+        self.cache.commit(self)
+
+    def discard(self):
+        self.file.close()
+        try:
+            os.remove(self.tmp)
+        except OSError:
+            pass
+
+
+class TeeReader(object):
+    """
+    File-like wrapper handing a streamed body to the parser while copying it to a CacheWriter.
+    """
+    def __init__(self, source, writer):
+        self.source = source
+        self.writer = writer
+
+    def read(self, size=-1):
+        data = self.source.read(size)
+        if data:
+            self.writer.write(data)
+        return data
+
+    def close(self):
+        self.source.close()
+
+
+class ConditionalCache(object):
+    """
+    On-disk store of the last library/hub response body per URL and its validators (ETag/Last-Modified), so requests
+    can be revalidated with If-None-Match/If-Modified-Since and a 304 answered from disk. Files are named by a hash of
+    the server and URL; the oldest are pruned once maxBytes is exceeded.
+    """
+    PATHS = re.compile(r'^/(library|hubs)(/|\?|$)')
+
+    def __init__(self, path=None, max_bytes=64 * 1024 * 1024):
+        self.path = path
+        self.maxBytes = max_bytes
+        self.size = None
+        self.stored = 0
+        self.revalidated = 0
+        self.bytesSaved = 0
+        self._lock = threading.Lock()
+
+    def __repr__(self):
+        return '<ConditionalCache bytes={0} stored={1} revalidated={2} saved={3:.1f}MB>'.format(
+            self.size, self.stored, self.revalidated, self.bytesSaved / 1048576.0
+        )
+
+    @property
+    def enabled(self):
+        return bool(self.path) and util.INTERFACE.getPreference("conditional_requests", False)
+
+    def setPath(self, path):
+        if not os.path.exists(path):
+            os.makedirs(path)
+        self.path = path
+
+    def handles(self, path):
+        return bool(self.PATHS.match(path))
+
+    def _filename(self, scope, url):
+        return os.path.join(self.path, hashlib.sha1(u'{0} {1}'.format(scope, url).encode('utf8')).hexdigest())
+
+    def open(self, scope, url):
+        filename = self._filename(scope, url)
+        try:
+            fileobj = open(filename, 'rb')
+        except (IOError, OSError):
+            return None
+
+        try:
+            meta = json.loads(fileobj.readline().decode('utf8'))
+        except ValueError:
+            fileobj.close()
+            return None
+
+        return CachedBody(filename, fileobj, meta)
+
+    def writer(self, scope, url, headers):
+        meta = {"etag": headers.get("ETag"), "lastModified": headers.get("Last-Modified")}
+        if not meta["etag"] and not meta["lastModified"]:
+            return None
+
+        try:
+            return CacheWriter(self, self._filename(scope, url), meta)
+        except (IOError, OSError):
+            util.ERROR()
+            return None
+
+    def reused(self, cached):
+        with self._lock:
+            self.revalidated += 1
+            self.bytesSaved += cached.size
+        try:
+            os.utime(cached.filename, None)
+        except OSError:
+            pass
+
+    def commit(self, writer):
+        try:
+            old = os.path.getsize(writer.filename) if os.path.exists(writer.filename) else 0
+            os.replace(writer.tmp, writer.filename)
+        except OSError:
+            # the target may be held open by a reader on some platforms; keep the old entry
+            writer.discard()
+            return
+
+        with self._lock:
+            self.stored += 1
+            if self.size is None:
+                self.size = self._scan()
+            else:
+                self.size += os.path.getsize(writer.filename) - old
+
+            if self.size > self.maxBytes:
+                self._prune()
+
+    def _entries(self):
+        entries = []
+        for name in os.listdir(self.path):
+            if name.endswith('.tmp'):
+                continue
+            try:
+                st = os.stat(os.path.join(self.path, name))
+            except OSError:
+                continue
+            entries.append((st.st_mtime, st.st_size, name))
+        return entries
+
+    def _scan(self):
+        return sum(e[1] for e in self._entries())
+
+    def _prune(self):
+        target = self.maxBytes * 0.8
+        for mtime, size, name in sorted(self._entries()):
+            if self.size <= target:
+                break
+            try:
+                os.remove(os.path.join(self.path, name))
+            except OSError:
+                continue
+            self.size -= size
+
+        util.DEBUG_LOG('Conditional cache pruned: {0}', self)
+
+
+RESPONSE_CACHE = ResponseCache()
+CONDITIONAL_CACHE = ConditionalCache()
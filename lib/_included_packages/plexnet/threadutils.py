@@ -2,7 +2,11 @@
 # import ctypes
 from __future__ import absolute_import
 import threading
-# import time
+import time
+
+from six.moves import queue
+
+from . import util
 
 
 # def _async_raise(tid, exctype):
@@ -92,3 +96,126 @@ class KillableThread(threading.Thread):
     #         self._Thread__target(*self._Thread__args, **self._Thread__kwargs)
     #     except KillThreadException:
     #         self.onKilled()
+
+
+class WorkerPool(object):
+    """
+    A bounded pool of long-lived threads running queued callables. Workers are spawned on demand up to
+    max_workers and exit after idling for idle_timeout seconds.
+    """
+    def __init__(self, name, max_workers=8, idle_timeout=60):
+        self.name = name
+        self.maxWorkers = max_workers
+        self.idleTimeout = idle_timeout
+        self.threadsStarted = 0
+        self.since = time.time()
+        self._queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._workers = 0
+        self._idle = 0
+        self._closed = False
+
+    def __repr__(self):
+        minutes = max(time.time() - self.since, 1) / 60.0
+        return '<WorkerPool {0} workers={1} idle={2} started={3} ({4:.1f}/min)>'.format(
+            self.name, self._workers, self._idle, self.threadsStarted, self.threadsStarted / minutes
+        )
+
+    def submit(self, target, *args, **kwargs):
+        if self._closed:
+            return False
+
+        self._queue.put((target, args, kwargs))
+        with self._lock:
+            if self._idle < self._queue.qsize() and self._workers < self.maxWorkers:
+                self._workers += 1
+                self.threadsStarted += 1
+                thread = KillableThread(target=self._loop, name='{0}:{1}'.format(self.name, self.threadsStarted))
+                thread.daemon = True
+                thread.start()
+        return True
+
+    def _loop(self):
+        while True:
+            with self._lock:
+                self._idle += 1
+            try:
+                item = self._queue.get(timeout=self.idleTimeout)
+            except queue.Empty:
+                item = None
+            finally:
+                with self._lock:
+                    self._idle -= 1
+
+            if item is None:
+                with self._lock:
+                    if self._closed or self._queue.empty():
+                        self._workers -= 1
+                        return
+                continue
+
+            target, args, kwargs = item
+            try:
+                target(*args, **kwargs)
+            except:
+                util.ERROR()
+
+    def shutdown(self):
+        self._closed = True
+        with self._lock:
+            workers = self._workers
+        for x in range(workers):
+            self._queue.put(None)
+
+
+class _Flight(object):
+    __slots__ = ("event", "result", "error")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight(object):
+    """
+    Collapses concurrent calls sharing a key into one: the first caller runs the function, callers arriving while it
+    is in flight wait for and share its result (or exception).
+    """
+    def __init__(self, name):
+        self.name = name
+        self.calls = 0
+        self.collapsed = 0
+        self._lock = threading.Lock()
+        self._flights = {}
+
+    def __repr__(self):
+        return '<SingleFlight {0} calls={1} collapsed={2}>'.format(self.name, self.calls, self.collapsed)
+
+    def do(self, key, func, *args, **kwargs):
+        with self._lock:
+            self.calls += 1
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = self._flights[key] = _Flight()
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            flight.result = func(*args, **kwargs)
+        except BaseException as e:
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._flights[key]
+            flight.event.set()
+
+        return flight.result
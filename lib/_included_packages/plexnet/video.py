@@ -245,11 +245,13 @@ class Video(media.MediaItem, AudioCodecMixin):
     def markWatched(self, **kwargs):
         path = '/:/scrobble?key=%s&identifier=com.plexapp.plugins.library' % self.ratingKey
         self.server.query(path)
+        self.server.invalidateResponseCache('watched state')
         self.reload(**kwargs)
 
     def markUnwatched(self, **kwargs):
         path = '/:/unscrobble?key=%s&identifier=com.plexapp.plugins.library' % self.ratingKey
         self.server.query(path)
+        self.server.invalidateResponseCache('watched state')
         self.reload(**kwargs)
 
     # def play(self, client):
@@ -1,12 +1,26 @@
 from __future__ import absolute_import
 import six.moves.queue
+import bisect
 import heapq
+import itertools
+import time
 from kodi_six import xbmc
 from . import util
-from plexnet import threadutils
+from plexnet import asyncadapter, threadutils
 from six.moves import range
 
 
+# name, seconds a lane may go without being served while it has tasks before its next one is served ahead of the
+# lanes above it (None: never), workers kept free for the lanes above it, most workers it may occupy
+LANES = (
+    ('interactive', None, 0, None),
+    ('visible', 2, 1, None),
+    ('bulk', 10, 2, None),
+    ('maintenance', 30, 2, 1),
+)
+INTERACTIVE, VISIBLE, BULK, MAINTENANCE = (lane[0] for lane in LANES)
+
+
 class Tasks(list):
     def add(self, task):
         for t in self:
@@ -28,9 +42,18 @@ class Tasks(list):
 
 
 class Task:
+    # the LANES entry tasks of this kind are queued in unless they're added to another one
+    LANE = INTERACTIVE
+
     def __init__(self, priority=None):
         self._priority = priority
         self._canceled = False
+        self._queue = None
+        self._group = None
+        self._lane = self.LANE
+        self._queuedAt = 0
+        # active on the worker thread while the task runs, so canceling aborts its in-flight requests
+        self.token = asyncadapter.CancelToken()
         self.finished = False
 
     def __cmp__(self, other):
@@ -55,8 +78,18 @@ class Task:
     def run(self):
         pass
 
+    def dedupeKey(self):
+        """
+        Tasks with the same key (other than None) do the same work: queueing one replaces an equivalent queued one.
+        """
+        return None
+
     def cancel(self):
         self._canceled = True
+        queue = self._queue
+        if queue:
+            queue.discard(self)
+        self.token.cancel()
 
     def isCanceled(self):
         return self._canceled or util.MONITOR.abortRequested()
@@ -65,37 +98,300 @@ class Task:
         return not self.finished and not self._canceled
 
 
-class MutablePriorityQueue(six.moves.queue.PriorityQueue):
-    def _get(self, heappop=heapq.heappop):
-        self.queue.sort()
-        return heappop(self.queue)
+class WaitHistogram(object):
+    """
+    How long tasks waited in a lane before a worker took them, bucketed by upper bound in seconds.
+    """
+    BOUNDS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+    def __init__(self):
+        self.counts = [0] * (len(self.BOUNDS) + 1)
+        self.total = 0.0
+
+    def __repr__(self):
+        labels = ['<{0}s'.format(b) for b in self.BOUNDS] + ['>={0}s'.format(self.BOUNDS[-1])]
+        return ' '.join('{0}:{1}'.format(l, c) for l, c in zip(labels, self.counts) if c) or 'empty'
+
+    def add(self, seconds):
+        self.counts[bisect.bisect_right(self.BOUNDS, seconds)] += 1
+        self.total += seconds
+
+    @property
+    def count(self):
+        return sum(self.counts)
+
+
+class Lane(object):
+    def __init__(self, name, rank, aging, reserved, limit):
+        self.name = name
+        self.rank = rank
+        self.aging = aging
+        self.reserved = reserved
+        self.limit = limit
+        self.maxWorkers = None
+        # heap of [priority, sequence, task or None]
+        self.heap = []
+        self.size = 0
+        self.running = 0
+        self.servedAt = 0
+        self.waits = WaitHistogram()
+
+    def __repr__(self):
+        return '<Lane {0} queued={1} running={2}/{3} waits: {4}>'.format(
+            self.name, self.size, self.running, self.maxWorkers, self.waits
+        )
+
+    def setWorkers(self, count):
+        self.maxWorkers = max(1, count - self.reserved)
+        if self.limit:
+            self.maxWorkers = min(self.maxWorkers, self.limit)
+
+    def top(self):
+        while self.heap and self.heap[0][2] is None:
+            heapq.heappop(self.heap)
+        return self.heap and self.heap[0] or None
+
+
+class IndexedPriorityQueue(six.moves.queue.Queue):
+    """
+    Queue of Tasks split into priority lanes (see LANES), each served lowest _priority first, with O(log n) put, get
+    and reprioritize and O(1) discard. Heap entries are indexed by task; reprioritized and discarded tasks leave their
+    old entry behind as a tombstone that's skipped when it reaches the top. Queued tasks can be dropped by group, and
+    a task replaces a queued one with the same dedupeKey().
+
+    Workers take from the highest lane that has tasks and isn't at its worker limit, except that a lane that hasn't
+    been served for longer than its aging time while it had tasks gets its next task served first, so lower lanes
+    slow down under a flood of higher priority work instead of starving.
+    """
+    def _init(self, maxsize):
+        self.lanes = [Lane(name, rank, aging, reserved, limit)
+                      for rank, (name, aging, reserved, limit) in enumerate(LANES)]
+        self._lanes = dict((lane.name, lane) for lane in self.lanes)
+        self._entries = {}
+        self._groups = {}
+        self._keys = {}
+        self._sequence = itertools.count()
+        self.replaced = 0
+        self.setWorkers(5)
+
+    def setWorkers(self, count):
+        for lane in self.lanes:
+            lane.setWorkers(count)
+
+    def _qsize(self):
+        return len(self._entries)
+
+    def _lane(self, task):
+        return self._lanes.get(task._lane) or self._lanes[INTERACTIVE]
+
+    def _put(self, task):
+        if task in self._entries:
+            self._entries[task][2] = None
+            self._lane(task).size -= 1
+            # still queued, so put() mustn't count it again; offsets the increment put() makes after _put()
+            self.unfinished_tasks -= 1
+        else:
+            key = task.dedupeKey()
+            if key is not None:
+                old = self._keys.get(key)
+                if old is not None:
+                    old._canceled = True
+                    self._drop(old)
+                    self.replaced += 1
+                self._keys[key] = task
+
+            if task._group is not None:
+                self._groups.setdefault(task._group, set()).add(task)
+            task._queue = self
+            task._queuedAt = time.time()
+
+        lane = self._lane(task)
+        entry = [task._priority, next(self._sequence), task]
+        self._entries[task] = entry
+        heapq.heappush(lane.heap, entry)
+        lane.size += 1
+
+    def _select(self, capped=True):
+        now = time.time()
+        first = None
+        for lane in self.lanes:
+            top = lane.top()
+            if not top or (capped and lane.running >= lane.maxWorkers):
+                continue
+            if lane.aging is not None and now - max(top[2]._queuedAt, lane.servedAt) >= lane.aging:
+                return lane
+            if first is None:
+                first = lane
+        return first
+
+    def _take(self, lane):
+        task = heapq.heappop(lane.heap)[2]
+        self._forget(task)
+        lane.running += 1
+        lane.servedAt = time.time()
+        lane.waits.add(lane.servedAt - task._queuedAt)
+        return task
+
+    def _get(self):
+        return self._take(self._select(capped=False))
+
+    def _forget(self, task):
+        self._entries.pop(task)[2] = None
+        self._lane(task).size -= 1
+        task._queue = None
+
+        key = task.dedupeKey()
+        if key is not None and self._keys.get(key) is task:
+            del self._keys[key]
+
+        if task._group is not None:
+            group = self._groups.get(task._group)
+            if group:
+                group.discard(task)
+                if not group:
+                    del self._groups[task._group]
+
+    def _drop(self, task):
+        # remove a task that will never be handed out, keeping unfinished_tasks in line for join()
+        self._forget(task)
+        self.unfinished_tasks -= 1
+        if not self.unfinished_tasks:
+            self.all_tasks_done.notify_all()
 
     def lowest(self):
-        """Return the lowest priority item in the queue (not reliable!)."""
-        self.mutex.acquire()
-        try:
-            lowest = self.queue and min(self.queue) or None
-        except:
-            lowest = None
-            util.ERROR()
-        finally:
-            self.mutex.release()
-        return lowest
+        """Return the queued task with the lowest priority across all lanes."""
+        with self.mutex:
+            tops = [top for top in (lane.top() for lane in self.lanes) if top]
+            return min(tops)[2] if tops else None
+
+    def reprioritize(self, task, priority, lane=None):
+        with self.mutex:
+            if task in self._entries:
+                self._entries[task][2] = None
+                self._lane(task).size -= 1
+                del self._entries[task]
+                task._priority = priority
+                task._lane = lane or task._lane
+                lane = self._lane(task)
+                entry = [priority, next(self._sequence), task]
+                self._entries[task] = entry
+                heapq.heappush(lane.heap, entry)
+                lane.size += 1
+            else:
+                task._priority = priority
+
+    def discard(self, task):
+        with self.mutex:
+            if task in self._entries:
+                self._drop(task)
+
+    def discardGroup(self, group):
+        """
+        Cancel and remove every queued task of group. Returns how many there were.
+        """
+        with self.mutex:
+            tasks = list(self._groups.get(group, ()))
+            for task in tasks:
+                task._canceled = True
+                self._drop(task)
+        return len(tasks)
+
+    def waitTask(self, timeout, abort):
+        """
+        Take the next task a worker may run, waiting up to timeout seconds for one. Returns None on timeout or once
+        abort() is true.
+        """
+        endtime = time.time() + timeout
+        with self.not_empty:
+            while True:
+                if abort():
+                    return None
+                lane = self._select()
+                if lane:
+                    break
+                remaining = endtime - time.time()
+                if remaining <= 0:
+                    return None
+                self.not_empty.wait(remaining)
+
+            task = self._take(lane)
+            self.not_full.notify()
+            return task
+
+    def taskDone(self, task):
+        """
+        Like task_done(), freeing the task's slot in its lane for the next waiting worker.
+        """
+        with self.mutex:
+            self._lane(task).running -= 1
+            self.not_empty.notify()
+        self.task_done()
+
+    def waitDone(self, abort):
+        """
+        Wait until every task taken off the queue is done and nothing is queued, or abort() is true.
+        """
+        with self.all_tasks_done:
+            while self.unfinished_tasks and not abort():
+                self.all_tasks_done.wait(0.1)
+
+    def wakeAll(self):
+        with self.mutex:
+            self.not_empty.notify_all()
+            self.all_tasks_done.notify_all()
+
+    def laneStats(self):
+        """
+        (name, queued, running, WaitHistogram) per lane.
+        """
+        with self.mutex:
+            return [(lane.name, lane.size, lane.running, lane.waits) for lane in self.lanes]
 
 
 class BackgroundWorker:
-    def __init__(self, queue, name=None):
+    """
+    A long-lived thread taking tasks off its threader's queue. Non-persistent workers exit after idling for
+    idle_timeout seconds and get started again when there's more work than idle workers.
+    """
+    def __init__(self, queue, name=None, persistent=False, idle_timeout=60):
         self._queue = queue
         self.name = name
+        self.persistent = persistent
+        self.idleTimeout = idle_timeout
         self._thread = None
         self._abort = False
         self._task = None
+        self._taskStarted = 0
+        self.idle = False
+        self.since = None
+        self.threadsStarted = 0
+        self.tasksRun = 0
+        self.busyTime = 0.0
+
+    def __repr__(self):
+        return '<BackgroundWorker {0} tasks={1} threads={2} utilization={3:.1f}%>'.format(
+            self.name, self.tasksRun, self.threadsStarted, self.utilization() * 100
+        )
+
+    def utilization(self):
+        """
+        Share of the time since the worker was first started spent running tasks.
+        """
+        if not self.since:
+            return 0.0
+
+        now = time.time()
+        busy = self.busyTime + (self._task and now - self._taskStarted or 0)
+        return busy / max(now - self.since, 0.001)
 
     def _runTask(self, task):
         if task._canceled:
             return
         try:
-            task._run()
+            with task.token:
+                task._run()
+        except asyncadapter.CanceledException:
+            util.DEBUG_LOG('BGThreader ({0}): Task canceled: {1}', self.name, task)
         except:
             util.ERROR()
 
@@ -106,32 +402,49 @@ class BackgroundWorker:
     def aborted(self):
         return self._abort or util.MONITOR.abortRequested()
 
+    def available(self):
+        return self.idle and self._thread and self._thread.is_alive()
+
     def start(self):
         if self._thread and self._thread.is_alive():
-            return
+            return False
 
+        self.since = self.since or time.time()
+        self.threadsStarted += 1
+        # counts as idle right away, it's about to wait for a task
+        self.idle = True
         self._thread = threadutils.KillableThread(target=self._queueLoop, name='BACKGROUND-WORKER({0})'.format(self.name))
         self._thread.start()
+        return True
 
     def _queueLoop(self):
-        if self._queue.empty():
-            return
-
         util.DEBUG_LOG('BGThreader: ({0}): Active', self.name)
-        try:
-            while not self.aborted():
-                self._task = self._queue.get_nowait()
-                self._runTask(self._task)
-                self._queue.task_done()
-                self._task = None
-        except six.moves.queue.Empty:
-            util.DEBUG_LOG('BGThreader ({0}): Idle', self.name)
+        while not self.aborted():
+            self.idle = True
+            task = self._queue.waitTask(self.idleTimeout, self.aborted)
+            self.idle = False
+            if task is None:
+                if self.persistent:
+                    continue
+                break
+
+            self._taskStarted = time.time()
+            self._task = task
+            self._runTask(task)
+            self._task = None
+            self.busyTime += time.time() - self._taskStarted
+            self.tasksRun += 1
+            self._queue.taskDone(task)
+
+        self.idle = False
+        util.DEBUG_LOG('BGThreader ({0}): Idle, exiting ({1})', self.name, self)
 
     def shutdown(self):
         self.abort()
 
-        if self._task:
-            self._task.cancel()
+        task = self._task
+        if task:
+            task.cancel()
 
         if self._thread and self._thread.is_alive():
             util.DEBUG_LOG('BGThreader: thread ({0}): Waiting...', self.name)
@@ -139,22 +452,28 @@ class BackgroundWorker:
             util.DEBUG_LOG('BGThreader: thread ({0}): Done', self.name)
 
     def working(self):
-        return self._thread and self._thread.is_alive()
-
-    def kill(self):
-        if self._thread and self._thread.is_alive():
-            util.DEBUG_LOG('BGThreader: thread ({0}): Waiting...', self.name)
-            self._thread.join()
-            util.DEBUG_LOG('BGThreader: thread ({0}): Done', self.name)
+        return self._task is not None
 
 
 class BackgroundThreader:
-    def __init__(self, name=None, worker_count=5):
+    MIN_WORKERS = 2
+    IDLE_TIMEOUT = 60
+
+    def __init__(self, name=None, worker_count=5, min_workers=MIN_WORKERS, idle_timeout=IDLE_TIMEOUT):
         self.name = name
-        self._queue = MutablePriorityQueue()
+        self._queue = IndexedPriorityQueue()
+        self._queue.setWorkers(worker_count)
         self._abort = False
         self._priority = -1
-        self.workers = [BackgroundWorker(self._queue, 'queue.{0}:worker.{1}'.format(self.name, x)) for x in range(worker_count)]
+        self.workers = [BackgroundWorker(self._queue, 'queue.{0}:worker.{1}'.format(self.name, x),
+                                         persistent=x < min_workers, idle_timeout=idle_timeout)
+                        for x in range(worker_count)]
+
+    def __repr__(self):
+        return '<BackgroundThreader {0} queued={1} busy={2}/{3} running={4}>'.format(
+            self.name, self._queue.qsize(), sum(1 for w in self.workers if w.working()), len(self.workers),
+            sum(1 for w in self.workers if w._thread and w._thread.is_alive())
+        )
 
     def _nextPriority(self):
         self._priority += 1
@@ -164,6 +483,7 @@ class BackgroundThreader:
         self._abort = True
         for w in self.workers:
             w.abort()
+        self._queue.wakeAll()
         return self
 
     def aborted(self):
@@ -174,35 +494,69 @@ class BackgroundThreader:
 
         for w in self.workers:
             w.shutdown()
+            util.DEBUG_LOG('BGThreader: {0}', w)
 
-    def addTask(self, task):
+        for lane in self._queue.lanes:
+            util.DEBUG_LOG('BGThreader: {0}', lane)
+
+    def addTask(self, task, group=None, lane=None):
         task._priority = self._nextPriority()
+        task._group = group
+        task._lane = lane or task.LANE
         self._queue.put(task)
         self.startWorkers()
 
-    def addTasks(self, tasks):
+    def addTasks(self, tasks, group=None, lane=None):
         for t in tasks:
             t._priority = self._nextPriority()
+            t._group = group
+            t._lane = lane or t.LANE
             self._queue.put(t)
 
         self.startWorkers()
 
-    def addTasksToFront(self, tasks):
+    def addTasksToFront(self, tasks, group=None, lane=None):
         lowest = self.getLowestPrority()
         if lowest is None:
-            return self.addTasks(tasks)
+            return self.addTasks(tasks, group=group, lane=lane)
 
         p = lowest - len(tasks)
         for t in tasks:
             t._priority = p
+            t._group = group
+            t._lane = lane or t.LANE
             self._queue.put(t)
             p += 1
 
         self.startWorkers()
 
+    def laneStats(self):
+        """
+        (name, queued, running, WaitHistogram) per lane.
+        """
+        return self._queue.laneStats()
+
+    def cancelGroup(self, group):
+        """
+        Cancel the tasks added with group, e.g. everything a closing window asked for: queued ones are dropped, running
+        ones have their requests aborted.
+        """
+        dropped = self._queue.discardGroup(group)
+        running = [t for t in (w._task for w in self.workers) if t is not None and t._group is group]
+        for task in running:
+            task.cancel()
+
+        if dropped or running:
+            util.DEBUG_LOG('BGThreader: Dropped {0} queued and canceled {1} running tasks of {2}', dropped,
+                           len(running), group)
+
     def startWorkers(self):
+        needed = self._queue.qsize() - sum(1 for w in self.workers if w.available())
         for w in self.workers:
-            w.start()
+            if needed <= 0:
+                break
+            if w.start():
+                needed -= 1
 
     def working(self):
         return not self._queue.empty() or self.hasTask()
@@ -212,21 +566,27 @@ class BackgroundThreader:
 
     def getLowestPrority(self):
         lowest = self._queue.lowest()
-        if not lowest:
+        if lowest is None:
             return None
 
         return lowest._priority
 
-    def moveToFront(self, qitem):
+    def moveToFront(self, qitem, lane=INTERACTIVE):
+        """
+        Make a queued task the next one to run, in lane: whoever calls this is waiting for it.
+        """
         lowest = self.getLowestPrority()
         if lowest is None:
             return
 
-        qitem._priority = lowest - 1
+        self._queue.reprioritize(qitem, lowest - 1, lane=lane)
 
     def kill(self):
-        for w in self.workers:
-            w.kill()
+        """
+        Wait for the queued and running tasks to finish.
+        """
+        util.DEBUG_LOG('BGThreader: Waiting for tasks: {0}', self)
+        self._queue.waitDone(self.aborted)
 
 
 class ThreaderManager:
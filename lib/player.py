@@ -941,6 +941,8 @@ class BGMPlayerHandler(BasePlayerHandler):
 
 
 class BGMPlayerTask(backgroundthread.Task):
+    LANE = backgroundthread.MAINTENANCE
+
     def setup(self, source, player, *args, **kwargs):
         self.source = source
         self.player = player
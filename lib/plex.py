@@ -1,4 +1,5 @@
 from __future__ import absolute_import
+import os
 import sys
 import platform
 import traceback
@@ -11,7 +12,7 @@ import six
 
 from kodi_six import xbmc, xbmcaddon
 
-from plexnet import plexapp, myplex, util as plexnet_util, asyncadapter, http as pnhttp
+from plexnet import plexapp, myplex, util as plexnet_util, asyncadapter, http as pnhttp, responsecache
 
 from .playback_utils import PlaybackManager
 from . windows.settings import PlayedThresholdSetting
@@ -301,6 +302,7 @@ asyncadapter.DEFAULT_TIMEOUT = pnhttp.DEFAULT_TIMEOUT
 plexapp.util.ACCEPT_LANGUAGE = util.ACCEPT_LANGUAGE_CODE
 plexapp.setUserAgent(defaultUserAgent())
 plexnet_util.BASE_HEADERS = plexnet_util.getPlexHeaders()
+responsecache.CONDITIONAL_CACHE.setPath(os.path.join(util.PROFILE, 'responses'))
 
 
 class CallbackEvent(plexapp.util.CompatEvent):
@@ -0,0 +1,300 @@
+# coding=utf-8
+
+import os
+import json
+import array
+import hashlib
+import tempfile
+
+from .util import PROFILE, ERROR, DEBUG_LOG
+
+
+class SectionSnapshot(object):
+    def __init__(self, totalSize, jumpList, items):
+        self.totalSize = totalSize
+        # (title, key, size) per jump list entry
+        self.jumpList = jumpList
+        # (label, label2, thumbnailImage, properties) per item of the first screenful
+        self.items = items
+
+
+def jumpKey(titleSort):
+    """
+    The /firstCharacter jump list key of an item: its titleSort's uppercased first letter, or "#" for anything else.
+    """
+    char = titleSort[:1].upper()
+    return char if char.isalpha() else '#'
+
+
+def groupJumpKeys(keys):
+    """
+    Jump list ((title, key, size) per entry) from the jump keys of a view's items, in order.
+    """
+    jumpList = []
+    for char in keys:
+        if jumpList and jumpList[-1][0] == char:
+            jumpList[-1][2] += 1
+        else:
+            jumpList.append([char, char == '#' and '%23' or char, 1])
+    return jumpList
+
+
+class JumpIndex(object):
+    """
+    Jump list of a titleSort view built from the titleSort values of its items as they're fetched. Only complete
+    once every position of the view is known. viewKey is what the view's contents depended on besides its size, see
+    LibraryWindow.viewKey().
+    """
+    def __init__(self, totalSize, jumpList=None, viewKey=None):
+        self.totalSize = totalSize
+        self.viewKey = viewKey
+        self.keys = {}
+        self._jumpList = jumpList
+
+    def update(self, start, items):
+        for pos, obj in enumerate(items, start):
+            if obj:
+                self.keys[pos] = jumpKey(obj.get('titleSort') or obj.title or '')
+
+    def isComplete(self):
+        return self._jumpList is not None or len(self.keys) >= self.totalSize
+
+    @property
+    def jumpList(self):
+        """
+        (title, key, size) per jump list entry, like LibraryWindow.sectionLayout() returns them.
+        """
+        if self._jumpList is None:
+            self._jumpList = groupJumpKeys(self.keys.get(pos) for pos in range(self.totalSize))
+        return self._jumpList
+
+
+class SectionIndex(object):
+    """
+    Columnar in-memory index of every item of a section's unfiltered view, in the order of the sort it was loaded
+    with, so common sorts and filters of the section can be answered locally.
+    """
+    SORTS = ('titleSort', 'year', 'addedAt', 'rating', 'viewCount', 'duration')
+    FILTERS = ('year', 'decade')
+
+    def __init__(self, totalSize, itemType, sort):
+        self.totalSize = totalSize
+        self.itemType = itemType
+        # the sort opts of the view the index was loaded from; row n is position n of that view
+        self.sort = sort
+        self.known = 0
+        self.collections = 0
+        self.objects = [None] * totalSize
+        self.rows = {}
+        self.titleSort = [''] * totalSize
+        self.year = array.array('i', [0]) * totalSize
+        self.addedAt = array.array('q', [0]) * totalSize
+        self.rating = array.array('d', [0]) * totalSize
+        self.viewCount = array.array('i', [0]) * totalSize
+        self.duration = array.array('q', [0]) * totalSize
+        self.unwatched = array.array('b', [0]) * totalSize
+
+    def update(self, start, items):
+        for row, obj in enumerate(items, start):
+            if obj and row < self.totalSize:
+                if self.objects[row] is None:
+                    self.known += 1
+                    if obj.TYPE == 'collection':
+                        self.collections += 1
+                self.objects[row] = obj
+                self.rows[obj.ratingKey] = row
+                self._setRow(row, obj)
+
+    def updateObject(self, obj):
+        """
+        Refresh the row of a reloaded item, e.g. after its watched state changed.
+        """
+        row = self.rows.get(obj.ratingKey)
+        if row is not None:
+            self.objects[row] = obj
+            self._setRow(row, obj)
+
+    def _setRow(self, row, obj):
+        self.titleSort[row] = (obj.get('titleSort') or obj.title or '').lower()
+        self.year[row] = obj.get('year').asInt()
+        self.addedAt[row] = obj.get('addedAt').asInt()
+        self.rating[row] = obj.get('rating').asFloat()
+        self.viewCount[row] = obj.get('viewCount').asInt()
+        self.duration[row] = obj.get('duration').asInt()
+        if obj.TYPE == 'show':
+            self.unwatched[row] = obj.get('leafCount').asInt() > obj.get('viewedLeafCount').asInt()
+        else:
+            self.unwatched[row] = not obj.get('viewCount').asInt()
+
+    def isComplete(self):
+        return self.known >= self.totalSize
+
+    def canAnswer(self, sort, filter_=None, unwatched=False):
+        if not self.isComplete() or (sort and sort[0] not in self.SORTS):
+            return False
+
+        if filter_ or unwatched:
+            # filtered views don't include collections, so their items can't be derived from a view that does
+            return not self.collections and (not filter_ or filter_[0] in self.FILTERS)
+
+        return True
+
+    def query(self, sort, filter_=None, unwatched=False):
+        """
+        Rows of the items of the given view, in its order.
+        """
+        rows = range(self.totalSize)
+        if unwatched:
+            unwatchedCol = self.unwatched
+            rows = [r for r in rows if unwatchedCol[r]]
+
+        if filter_:
+            ftype, value = filter_
+            year = self.year
+            if ftype == 'year':
+                value = int(value)
+                rows = [r for r in rows if year[r] == value]
+            elif ftype == 'decade':
+                value = int(value)
+                rows = [r for r in rows if value <= year[r] < value + 10]
+
+        rows = list(rows)
+        if not sort:
+            return rows
+
+        field, direction = sort
+        if self.sort and field == self.sort[0]:
+            # the server's own order, ties included
+            if direction != self.sort[1]:
+                rows.reverse()
+            return rows
+
+        column = getattr(self, field)
+        if field != 'titleSort':
+            rows.sort(key=self.titleSort.__getitem__)
+        rows.sort(key=column.__getitem__, reverse=direction == 'desc')
+        return rows
+
+    def jumpList(self, rows):
+        titleSort = self.titleSort
+        return groupJumpKeys(jumpKey(titleSort[r]) for r in rows)
+
+
+class SectionSnapshotCache(object):
+    """
+    Per server/section/view snapshots of the library window's layout (total size, jump list) and first screenful of
+    tiles, so the window can paint before the server answers, and of verified JumpIndexes. Entries are only valid while
+    the section's contentChangedAt/updatedAt matches the one they were stored with.
+    """
+    MAX_FILES = 200
+
+    def __init__(self, path=os.path.join(PROFILE, "section_snapshots")):
+        self.path = path
+
+    def _filename(self, section, view):
+        key = u'{0} {1} {2}'.format(section.server.uuid, section.key, json.dumps(view, sort_keys=True))
+        return os.path.join(self.path, hashlib.sha1(key.encode('utf8')).hexdigest() + '.json')
+
+    @staticmethod
+    def sectionVersion(section):
+        version = section.get('contentChangedAt') or section.get('updatedAt')
+        return version and str(version) or None
+
+    def get(self, section, view):
+        data = self._load(section, view)
+        if not data:
+            return None
+
+        return SectionSnapshot(data["totalSize"], data["jumpList"], data["items"])
+
+    def set(self, section, view, snapshot):
+        self._store(section, view, {
+            "totalSize": snapshot.totalSize,
+            "jumpList": snapshot.jumpList,
+            "items": snapshot.items
+        })
+
+    def getJumpIndex(self, section, view):
+        data = self._load(section, dict(view, index="jump"))
+        if not data:
+            return None
+
+        return JumpIndex(data["totalSize"], data["jumpList"], data.get("viewKey"))
+
+    def setJumpIndex(self, section, view, index):
+        self._store(section, dict(view, index="jump"), {
+            "totalSize": index.totalSize,
+            "jumpList": index.jumpList,
+            "viewKey": index.viewKey
+        })
+
+    def _load(self, section, view):
+        version = self.sectionVersion(section)
+        if not version:
+            return None
+
+        filename = self._filename(section, view)
+        try:
+            with open(filename, 'r') as f:
+                data = json.load(f)
+        except (IOError, OSError):
+            return None
+        except ValueError:
+            ERROR("Couldn't read section snapshot")
+            return None
+
+        if data.get("version") != version:
+            DEBUG_LOG('Section snapshot for {0} is outdated ({1} != {2})', section.key, data.get("version"), version)
+            self._remove(filename)
+            return None
+
+        return data
+
+    def _store(self, section, view, data):
+        version = self.sectionVersion(section)
+        if not version:
+            return
+
+        data["version"] = version
+        try:
+            if not os.path.exists(self.path):
+                os.makedirs(self.path)
+
+            fd, tmp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+            with os.fdopen(fd, 'w') as f:
+                json.dump(data, f)
+            os.replace(tmp, self._filename(section, view))
+        except (IOError, OSError):
+            ERROR("Couldn't write section snapshot")
+            return
+
+        self._prune()
+
+    def _remove(self, filename):
+        try:
+            os.remove(filename)
+        except OSError:
+            pass
+
+    def _prune(self):
+        try:
+            names = os.listdir(self.path)
+        except OSError:
+            return
+
+        if len(names) <= self.MAX_FILES:
+            return
+
+        entries = []
+        for name in names:
+            filename = os.path.join(self.path, name)
+            try:
+                entries.append((os.path.getmtime(filename), filename))
+            except OSError:
+                continue
+
+        for mtime, filename in sorted(entries)[:len(entries) - self.MAX_FILES]:
+            self._remove(filename)
+
+
+snapshots = SectionSnapshotCache()
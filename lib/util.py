@@ -8,6 +8,8 @@ import binascii
 import json
 import threading
 import math
+import heapq
+import itertools
 import time
 import datetime
 import contextlib
@@ -194,6 +196,10 @@ class AddonSettings(object):
         ("consecutive_video_pb_wait", 0.0),
         ("retrieve_all_media_up_front", False),
         ("library_chunk_size", 240),
+        ("library_chunk_size_adaptive", True),
+        ("library_snapshots", True),
+        ("library_local_index", True),
+        ("library_loaded_items_max", 2400),
         ("verify_mapped_files", True),
         ("episode_no_spoiler_blur", 16),
         ("ignore_docker_v4", True),
@@ -642,6 +648,9 @@ CRON = None
 
 
 class CronReceiver():
+    # seconds between tick() calls; None: the interval of the Cron it's registered with
+    TICK_INTERVAL = None
+
     def tick(self):
         pass
 
@@ -653,18 +662,37 @@ class CronReceiver():
 
 
 class Cron(threading.Thread):
+    """
+    Ticks each registered receiver at its own interval and calls halfHour()/day() when those come around. The thread
+    sleeps until the next of those is due, or until forceTick() asks for every receiver to tick right away.
+    """
+    # longest sleep before checking whether Kodi is shutting down
+    ABORT_CHECK = 5
+
     def __init__(self, interval):
         threading.Thread.__init__(self, name='CRON')
         self.stopped = threading.Event()
         self.force = threading.Event()
         self.interval = interval
+        self.ticks = 0
+        self.wakeups = 0
         self._lastHalfHour = self._getHalfHour()
+        self._nextHalfHour = self._halfHourDue()
         self._receivers = []
+        # [due, seq, receiver, interval] per receiver; canceled and superseded entries stay in the heap with receiver
+        # set to None
+        self._heap = []
+        self._entries = {}
+        self._sequence = itertools.count()
+        self._lock = threading.Condition()
 
         global CRON
 
         CRON = self
 
+    def __repr__(self):
+        return '<Cron receivers={0} ticks={1} wakeups={2}>'.format(len(self._receivers), self.ticks, self.wakeups)
+
     def __enter__(self):
         self.start()
         DEBUG_LOG('Cron started')
@@ -675,36 +703,73 @@ class Cron(threading.Thread):
         self.join()
 
     def _wait(self):
-        ct = 0
-        while ct < self.interval:
-            xbmc.sleep(100)
-            ct += 0.1
-            if self.force.isSet():
-                self.force.clear()
-                return True
-            if MONITOR.abortRequested() or self.stopped.isSet():
-                return False
-        return True
+        """
+        Sleep until a receiver is due, a tick is forced or the Cron is stopped. Returns (receivers to tick, whether a
+        half hour has come around), or None once stopped.
+        """
+        with self._lock:
+            while True:
+                if self.stopped.is_set() or MONITOR.abortRequested():
+                    return None
+
+                now = time.time()
+                if self.force.is_set():
+                    self.force.clear()
+                    for entry in list(self._entries.values()):
+                        self._schedule(entry[2], entry[3], now)
+                    return list(self._receivers), now >= self._nextHalfHour
+
+                due = []
+                while self._heap and self._heap[0][0] <= now:
+                    entry = heapq.heappop(self._heap)
+                    if entry[2] is not None:
+                        due.append(entry[2])
+                        self._schedule(entry[2], entry[3], now)
+
+                if due or now >= self._nextHalfHour:
+                    return due, now >= self._nextHalfHour
+
+                nextDue = self._nextHalfHour
+                if self._heap:
+                    nextDue = min(self._heap[0][0], nextDue)
+                self._lock.wait(min(nextDue - now, self.ABORT_CHECK))
+                self.wakeups += 1
+
+    def _notify(self):
+        with self._lock:
+            self._lock.notify()
 
     def forceTick(self):
         self.force.set()
+        self._notify()
 
     def stop(self):
         self.stopped.set()
+        self._notify()
 
     def run(self):
-        while self._wait():
-            self._tick()
-        DEBUG_LOG('Cron stopped')
+        while True:
+            due = self._wait()
+            if due is None:
+                break
+            self._tick(*due)
+        DEBUG_LOG('Cron stopped: {0}', self)
 
     def _getHalfHour(self):
         tid = timeInDayLocalSeconds() / 60
         return tid - (tid % 30)
 
-    def _tick(self):
-        receivers = list(self._receivers)
-        receivers = self._halfHour(receivers)
+    def _halfHourDue(self):
+        return time.time() + 1800 - timeInDayLocalSeconds() % 1800
+
+    def _tick(self, receivers, halfHour=False):
+        if halfHour:
+            self._nextHalfHour = self._halfHourDue()
+            handled = set(self._receivers) - set(self._halfHour(list(self._receivers)))
+            receivers = [r for r in receivers if r not in handled]
+
         for r in receivers:
+            self.ticks += 1
             try:
                 r.tick()
             except:
@@ -741,15 +806,34 @@ class Cron(threading.Thread):
                 ERROR()
         return ret
 
-    def registerReceiver(self, receiver):
-        if receiver not in self._receivers:
-            DEBUG_LOG('Cron: Receiver added: {0}'.format(receiver))
+    def _schedule(self, receiver, interval, now):
+        old = self._entries.get(receiver)
+        if old:
+            old[2] = None
+        entry = [now + interval, next(self._sequence), receiver, interval]
+        self._entries[receiver] = entry
+        heapq.heappush(self._heap, entry)
+
+    def registerReceiver(self, receiver, interval=None):
+        """
+        Tick receiver every interval seconds, by default its TICK_INTERVAL or the Cron's interval.
+        """
+        interval = interval or getattr(receiver, 'TICK_INTERVAL', None) or self.interval
+        with self._lock:
+            if receiver in self._receivers:
+                return
+            DEBUG_LOG('Cron: Receiver added: {0} (every {1}s)'.format(receiver, interval))
             self._receivers.append(receiver)
+            self._schedule(receiver, interval, time.time())
+            self._lock.notify()
 
     def cancelReceiver(self, receiver):
-        if receiver in self._receivers:
+        with self._lock:
+            if receiver not in self._receivers:
+                return
             DEBUG_LOG('Cron: Receiver canceled: {0}'.format(receiver))
             self._receivers.pop(self._receivers.index(receiver))
+            self._entries.pop(receiver)[2] = None
 
 
 def getTimeFormat():
@@ -28,12 +28,17 @@ VIDEO_RELOAD_KW = dict(includeExtras=1, includeExtrasCount=10, includeChapters=1
 
 
 class EpisodeReloadTask(backgroundthread.Task):
+    LANE = backgroundthread.VISIBLE
+
     def setup(self, episode, callback, with_progress=False):
         self.episode = episode
         self.callback = callback
         self.withProgress = with_progress
         return self
 
+    def dedupeKey(self):
+        return self.callback, self.episode.ratingKey, self.withProgress
+
     def run(self):
         if self.isCanceled():
             return
@@ -66,7 +71,8 @@ class EpisodesPaginator(pagination.MCLPaginator):
 
     def createListItem(self, data):
         mli = super(EpisodesPaginator, self).createListItem(data)
-        self.parentWindow.setItemInfo(data, mli)
+        with mli.batch():
+            self.parentWindow.setItemInfo(data, mli)
         return mli
 
     def prepareListItem(self, data, mli):
@@ -1093,13 +1099,15 @@ class EpisodesWindow(kodigui.ControlledWindow, windowutils.UtilMixin, SeasonsMix
     @busy.dialog()
     def updateItems(self, item=None):
         if item:
-            item.setProperty('unwatched', not item.dataSource.isWatched and '1' or '')
-            item.setProperty('watched', item.dataSource.isFullyWatched and '1' or '')
-            self.setProgress(item)
-            item.setProperty('progress', util.getProgressImage(item.dataSource))
+            with item.batch():
+                item.setProperty('unwatched', not item.dataSource.isWatched and '1' or '')
+                item.setProperty('watched', item.dataSource.isFullyWatched and '1' or '')
+                self.setProgress(item)
+                item.setProperty('progress', util.getProgressImage(item.dataSource))
             (self.season or self.show_).reload()
 
-            self.setUserItemInfo(item)
+            with item.batch():
+                self.setUserItemInfo(item)
         else:
             self.fillEpisodes(update=True)
 
@@ -1250,11 +1258,12 @@ class EpisodesWindow(kodigui.ControlledWindow, windowutils.UtilMixin, SeasonsMix
             subtitle,
             data_source=episode
         )
-        self.setUserItemInfo(mli, types=("title", "thumbnail"))
-        mli.setProperty('episode.number', str(episode.index) or '')
-        mli.setProperty('episode.duration', util.durationToText(episode.duration.asInt()))
-        mli.setProperty('unwatched', not episode.isWatched and '1' or '')
-        mli.setProperty('watched', episode.isFullyWatched and '1' or '')
+        with mli.batch():
+            self.setUserItemInfo(mli, types=("title", "thumbnail"))
+            mli.setProperty('episode.number', str(episode.index) or '')
+            mli.setProperty('episode.duration', util.durationToText(episode.duration.asInt()))
+            mli.setProperty('unwatched', not episode.isWatched and '1' or '')
+            mli.setProperty('watched', episode.isFullyWatched and '1' or '')
         # mli.setProperty('progress', util.getProgressImage(obj))
         return mli
 
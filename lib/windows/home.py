@@ -92,11 +92,16 @@ class SectionHubsTask(backgroundthread.Task):
 
 
 class UpdateHubTask(backgroundthread.Task):
+    LANE = backgroundthread.VISIBLE
+
     def setup(self, hub, callback):
         self.hub = hub
         self.callback = callback
         return self
 
+    def dedupeKey(self):
+        return self.callback, self.hub
+
     def run(self):
         if self.isCanceled():
             return
@@ -273,6 +278,9 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
     width = 1920
     height = 1080
 
+    # tick() only checks whether the shown hubs are older than HUBS_REFRESH_INTERVAL
+    TICK_INTERVAL = 5
+
     OPTIONS_GROUP_ID = 200
 
     SECTION_LIST_ID = 101
@@ -941,11 +949,15 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
                     sections.add(mli.dataSource)
             tasks = [SectionHubsTask().setup(s, self.sectionHubsCallback, self.wantedSections, self.ignoredHubs)
                      for s in [self.lastSection] + list(sections)]
+            self.tasks += tasks
+            backgroundthread.BGThreader.addTasks(tasks[:1])
+            # the other sections' hubs aren't on screen
+            backgroundthread.BGThreader.addTasks(tasks[1:], lane=backgroundthread.BULK)
         else:
             tasks = [UpdateHubTask().setup(hub, self.updateHubCallback)
                      for hub in self.updateHubs.values()]
-        self.tasks += tasks
-        backgroundthread.BGThreader.addTasks(tasks)
+            self.tasks += tasks
+            backgroundthread.BGThreader.addTasks(tasks)
 
     def showBusy(self, on=True):
         self.setProperty('busy', on and '1' or '')
@@ -1501,7 +1513,9 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
         if plexapp.SERVERMANAGER.selectedServer.hasHubs():
             self.tasks = [SectionHubsTask().setup(s, self.sectionHubsCallback, self.wantedSections, self.ignoredHubs)
                           for s in [home_section] + sections]
-            backgroundthread.BGThreader.addTasks(self.tasks)
+            backgroundthread.BGThreader.addTasks(self.tasks[:1])
+            # preloaded for when their section gets selected, which moves them to the front
+            backgroundthread.BGThreader.addTasks(self.tasks[1:], lane=backgroundthread.BULK)
 
         show_pm_indicator = util.getSetting('path_mapping_indicators', True)
         for section in sections:
@@ -1586,6 +1600,10 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
                 "Home" if section.key is None else section.key, update, "Unknown" if not hubs else hubs.invalid))
             hubs.lastUpdated = time.time()
             self.cleanTasks()
+            # a refresh still running for this section is superseded by the one we're about to start
+            for task in self.tasks:
+                if isinstance(task, SectionHubsTask) and task.section == section:
+                    task.cancel()
             # remember selected positions in hubs
             is_home = section.key is None
             _rp = {}
@@ -1688,40 +1706,44 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
         else:
             subtitle = obj.originallyAvailableAt.asDatetime('%m/%d/%y')
 
-        if wide:
-            mli.setLabel2(u'{0} - {1}'.format(util.shortenText(obj.title, 35), subtitle))
-        else:
-            mli.setLabel2(subtitle)
+        with mli.batch():
+            if wide:
+                mli.setLabel2(u'{0} - {1}'.format(util.shortenText(obj.title, 35), subtitle))
+            else:
+                mli.setLabel2(subtitle)
 
-        mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/show.png')
-        if not obj.isWatched:
-            mli.setProperty('unwatched', '1')
-        mli.setBoolProperty('watched', obj.isFullyWatched)
+            mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/show.png')
+            if not obj.isWatched:
+                mli.setProperty('unwatched', '1')
+            mli.setBoolProperty('watched', obj.isFullyWatched)
         return mli
 
     def createSeasonListItem(self, obj, wide=False):
         mli = self.createParentedListItem(obj, *self.THUMB_POSTER_DIM)
         # mli.setLabel2('Season {0}'.format(obj.index))
-        mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/show.png')
-        if not obj.isWatched:
-            mli.setProperty('unwatched.count', str(obj.unViewedLeafCount))
-        mli.setBoolProperty('watched', obj.isFullyWatched)
+        with mli.batch():
+            mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/show.png')
+            if not obj.isWatched:
+                mli.setProperty('unwatched.count', str(obj.unViewedLeafCount))
+            mli.setBoolProperty('watched', obj.isFullyWatched)
         return mli
 
     def createMovieListItem(self, obj, wide=False):
         mli = kodigui.ManagedListItem(obj.defaultTitle, obj.year, thumbnailImage=obj.defaultThumb.asTranscodedImageURL(*self.THUMB_POSTER_DIM), data_source=obj)
-        mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/movie.png')
-        if not obj.isWatched:
-            mli.setProperty('unwatched', '1')
-        mli.setBoolProperty('watched', obj.isFullyWatched)
+        with mli.batch():
+            mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/movie.png')
+            if not obj.isWatched:
+                mli.setProperty('unwatched', '1')
+            mli.setBoolProperty('watched', obj.isFullyWatched)
         return mli
 
     def createShowListItem(self, obj, wide=False):
         mli = self.createSimpleListItem(obj, *self.THUMB_POSTER_DIM)
-        mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/show.png')
-        if not obj.isWatched:
-            mli.setProperty('unwatched.count', str(obj.unViewedLeafCount))
-        mli.setBoolProperty('watched', obj.isFullyWatched)
+        with mli.batch():
+            mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/show.png')
+            if not obj.isWatched:
+                mli.setProperty('unwatched.count', str(obj.unViewedLeafCount))
+            mli.setBoolProperty('watched', obj.isFullyWatched)
         return mli
 
     def createAlbumListItem(self, obj, wide=False):
@@ -1832,25 +1854,24 @@ class HomeWindow(kodigui.BaseWindow, util.CronReceiver, SpoilersMixin):
             if mli:
                 items.append(mli)
 
-        if with_progress:
-            for mli in items:
-                mli.setProperty('progress', util.getProgressImage(mli.dataSource))
-        if with_art:
-            for mli in items:
-                extra_opts = {}
-                thumb = mli.dataSource.art
-                # use episode thumbnail for in progress episodes
-                if mli.dataSource.type == 'episode' and util.addonSettings.continueUseThumb and check_spoilers:
-                    # blur them if we don't want any spoilers and the episode hasn't been fully watched
-                    if mli.dataSource._noSpoilers:
-                        extra_opts = {"blur": util.addonSettings.episodeNoSpoilerBlur}
-                    thumb = mli.dataSource.thumb
-
-                mli.setThumbnailImage(thumb.asTranscodedImageURL(*self.THUMB_AR16X9_DIM, **extra_opts))
-                mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/movie16x9.png')
-        if ar16x9:
+        if with_progress or with_art or ar16x9:
             for mli in items:
-                mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/movie16x9.png')
+                with mli.batch():
+                    if with_progress:
+                        mli.setProperty('progress', util.getProgressImage(mli.dataSource))
+                    if with_art:
+                        extra_opts = {}
+                        thumb = mli.dataSource.art
+                        # use episode thumbnail for in progress episodes
+                        if mli.dataSource.type == 'episode' and util.addonSettings.continueUseThumb and check_spoilers:
+                            # blur them if we don't want any spoilers and the episode hasn't been fully watched
+                            if mli.dataSource._noSpoilers:
+                                extra_opts = {"blur": util.addonSettings.episodeNoSpoilerBlur}
+                            thumb = mli.dataSource.thumb
+
+                        mli.setThumbnailImage(thumb.asTranscodedImageURL(*self.THUMB_AR16X9_DIM, **extra_opts))
+                    if with_art or ar16x9:
+                        mli.setProperty('thumb.fallback', 'script.plex/thumb_fallbacks/movie16x9.png')
 
         more = hub.more.asBool()
         if more:
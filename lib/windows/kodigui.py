@@ -360,7 +360,7 @@ DUMMY_DATA_SOURCE = DummyDataSource()
 
 class ManagedListItem(object):
     __slots__ = ("_listItem", "dataSource", "properties", "label", "label2", "iconImage", "thumbnailImage", "path",
-                 "_ID", "_manager", "_valid")
+                 "_ID", "_manager", "_valid", "_batch")
 
     PROPS = {
         'use_alt_watched': util.getSetting('use_alt_watched', True) and '1' or '',
@@ -381,13 +381,35 @@ class ManagedListItem(object):
         self._ID = None
         self._manager = None
         self._valid = True
-        for k, v in self.PROPS.items():
-            self.setProperty(k, v)
-
-        if properties:
-            for k, v in properties.items():
+        self._batch = None
+        with self.batch():
+            for k, v in self.PROPS.items():
                 self.setProperty(k, v)
 
+            if properties:
+                for k, v in properties.items():
+                    self.setProperty(k, v)
+
+    @classmethod
+    def virtual(cls, manager, properties):
+        """
+        Wrap a ListItem that already lives in manager's control without creating a new one.
+        """
+        self = cls.__new__(cls)
+        self._listItem = None
+        self.dataSource = None
+        self.properties = properties
+        self.label = ''
+        self.label2 = ''
+        self.iconImage = ''
+        self.thumbnailImage = ''
+        self.path = ''
+        self._ID = manager._nextID()
+        self._manager = manager
+        self._valid = True
+        self._batch = None
+        return self
+
     def __nonzero__(self):
         return self._valid
 
@@ -409,6 +431,13 @@ class ManagedListItem(object):
         self._listItem = DUMMY_LIST_ITEM
         self.dataSource = DUMMY_DATA_SOURCE
 
+    def batch(self):
+        """
+        Collect label, art, path and property changes made inside the with block and write them to the ListItem in
+        one pass when it exits.
+        """
+        return ListItemBatch(self)
+
     def _takeListItem(self, manager, lid):
         self._manager = manager
         self._ID = lid
@@ -427,6 +456,41 @@ class ManagedListItem(object):
         for k in self._manager._properties.keys():
             self.listItem.setProperty(k, self.properties.get(k) or '')
 
+    def _rowState(self):
+        return self._ID, self.label, self.label2, self.thumbnailImage, self.iconImage, self.path, dict(self.properties)
+
+    def _updateListItemFrom(self, state):
+        """
+        Write only what differs from state, the _rowState() of the item this ListItem showed until now. Returns the
+        number of properties written and whether anything was written at all.
+        """
+        ID, label, label2, thumbnailImage, iconImage, path, properties = state
+        li = self.listItem
+        written = False
+        if self._ID != ID:
+            li.setProperty('__ID__', self._ID)
+        if self.label != label:
+            li.setLabel(self.label)
+            written = True
+        if self.label2 != label2:
+            li.setLabel2(self.label2)
+            written = True
+        if self.thumbnailImage != thumbnailImage or self.iconImage != iconImage:
+            li.setArt({"thumb": self.thumbnailImage, "icon": self.iconImage})
+            written = True
+        if self.path != path:
+            li.setPath(self.path)
+            written = True
+
+        count = 0
+        for k in self._manager._properties.keys():
+            value = self.properties.get(k) or ''
+            if value != (properties.get(k) or ''):
+                li.setProperty(k, value)
+                count += 1
+
+        return count, written or bool(count)
+
     def clear(self):
         self.label = ''
         self.label2 = ''
@@ -473,10 +537,21 @@ class ManagedListItem(object):
         return self.listItem.select(selected)
 
     def setArt(self, values):
+        # keep thumbnailImage/iconImage in line, a batch flush reads them back
+        if "thumb" in values:
+            self.thumbnailImage = values["thumb"]
+        if "icon" in values:
+            self.iconImage = values["icon"]
+        if self._batch:
+            self._batch.art.update(values)
+            return
         return self.listItem.setArt(values)
 
     def setIconImage(self, icon):
         self.iconImage = icon
+        if self._batch:
+            self._batch.art["icon"] = icon
+            return
         return self.listItem.setArt({"icon": self.iconImage})
 
     def setInfo(self, itype, infoLabels):
@@ -484,10 +559,16 @@ class ManagedListItem(object):
 
     def setLabel(self, label):
         self.label = label
+        if self._batch:
+            self._batch.label = True
+            return
         return self.listItem.setLabel(label)
 
     def setLabel2(self, label):
         self.label2 = label
+        if self._batch:
+            self._batch.label2 = True
+            return
         return self.listItem.setLabel2(label)
 
     def setMimeType(self, mimetype):
@@ -495,12 +576,18 @@ class ManagedListItem(object):
 
     def setPath(self, path):
         self.path = path
+        if self._batch:
+            self._batch.path = True
+            return
         return self.listItem.setPath(path)
 
     def setProperty(self, key, value):
         if self._manager:
             self._manager._properties[key] = 1
         self.properties[key] = value
+        if self._batch:
+            self._batch.properties.add(key)
+            return self
         self.listItem.setProperty(key, value)
         return self
 
@@ -521,12 +608,68 @@ class ManagedListItem(object):
 
     def setThumbnailImage(self, thumb):
         self.thumbnailImage = thumb
+        if self._batch:
+            self._batch.art["thumb"] = thumb
+            return
         return self.listItem.setArt({"thumb": self.thumbnailImage})
 
     def onDestroy(self):
         pass
 
 
+class ListItemBatch(object):
+    """
+    Pending ListItem writes of a ManagedListItem. Values are read back from the ManagedListItem on flush so changes
+    written directly in between (e.g. by clear()) aren't overwritten with stale ones.
+    """
+    __slots__ = ("mli", "label", "label2", "path", "art", "properties", "nested")
+
+    def __init__(self, mli):
+        self.mli = mli
+        self.label = self.label2 = self.path = False
+        self.art = {}
+        self.properties = set()
+        self.nested = False
+
+    def __enter__(self):
+        if self.mli._batch:
+            self.nested = True
+        else:
+            self.mli._batch = self
+        return self.mli
+
+    def __exit__(self, exc_type, exc_value, tb):
+        if self.nested:
+            return
+
+        self.mli._batch = None
+        self.flush()
+
+    def flush(self):
+        mli = self.mli
+        if not (self.label or self.label2 or self.path or self.art or self.properties):
+            return
+
+        li = mli.listItem
+        if not li:
+            return
+
+        if self.label:
+            li.setLabel(mli.label)
+        if self.label2:
+            li.setLabel2(mli.label2)
+        if self.art:
+            if "thumb" in self.art:
+                self.art["thumb"] = mli.thumbnailImage
+            if "icon" in self.art:
+                self.art["icon"] = mli.iconImage
+            li.setArt(self.art)
+        if self.path:
+            li.setPath(mli.path)
+        if self.properties:
+            li.setProperties(dict((k, mli.properties.get(k) or '') for k in self.properties))
+
+
 def watchMarkerSettingsChanged(*args, **kwargs):
     ManagedListItem.PROPS['use_alt_watched'] = util.getSetting('use_alt_watched', True) and '1' or ''
     ManagedListItem.PROPS['hide_aw_bg'] = util.getSetting('hide_aw_bg', False) and '1' or ''
@@ -536,6 +679,177 @@ pnUtil.APP.on('change:use_alt_watched', watchMarkerSettingsChanged)
 pnUtil.APP.on('change:hide_aw_bg', watchMarkerSettingsChanged)
 
 
+class VirtualItems(object):
+    """
+    Stand-in for ManagedControlList.items on very long lists. The control holds one bare row per position, which only
+    gets its placeholder properties(origin) once it's near the shown part of the list (see place()), while the
+    ManagedListItem wrapping a position is only created once that position is accessed. Unmaterialized positions are
+    stored as their original index.
+    """
+    __slots__ = ("manager", "properties", "_items", "_positions", "_placed")
+
+    # positions around the selected one that get their placeholder properties when the control is filled
+    WINDOW = 100
+
+    def __init__(self, manager, size, properties):
+        self.manager = manager
+        self.properties = properties
+        self._items = list(range(size))
+        self._positions = {}
+        self._placed = bytearray(size)
+
+    def __len__(self):
+        return len(self._items)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self._items)))]
+
+        if idx < 0:
+            idx += len(self._items)
+
+        mli = self._items[idx]
+        if isinstance(mli, int):
+            # the wrapper takes the placeholder properties as already written to the row
+            self.place(idx, idx + 1)
+            mli = ManagedListItem.virtual(self.manager, self.propertiesFor(mli))
+            self._items[idx] = mli
+            self._positions[mli] = idx
+        return mli
+
+    def __iter__(self):
+        for mli in self._items:
+            if not isinstance(mli, int):
+                yield mli
+
+    def __iadd__(self, managed_items):
+        for mli in managed_items:
+            self._positions[mli] = len(self._items)
+            self._items.append(mli)
+            self._placed.append(1)
+        return self
+
+    def propertiesFor(self, origin):
+        props = dict(ManagedListItem.PROPS)
+        props.update(self.properties(origin))
+        return props
+
+    def isMaterialized(self, idx):
+        return not isinstance(self._items[idx], int)
+
+    def index(self, mli):
+        try:
+            return self._positions[mli]
+        except KeyError:
+            raise ValueError('{0} is not in list'.format(mli))
+
+    def pop(self, idx):
+        mli = self[idx]
+        self._items.pop(idx)
+        del self._placed[idx]
+        self._positions = dict((m, i) for i, m in enumerate(self._items) if not isinstance(m, int))
+        return mli
+
+    def listItems(self):
+        """
+        Rows for a fresh control. Kodi needs one per position, but plain labels spare building a ListItem for each;
+        placeholder properties are written by place() and materialized positions are filled in by
+        ManagedControlList._updateItems.
+        """
+        self._placed = bytearray(0 if isinstance(mli, int) else 1 for mli in self._items)
+        return [''] * len(self._items)
+
+    def place(self, bottom, top):
+        """
+        Write the placeholder properties of the rows from bottom to top that don't have them yet.
+        """
+        bottom, top = max(bottom, 0), min(top, len(self._items))
+        if bottom >= top:
+            return
+
+        idx = self._placed.find(0, bottom, top)
+        while idx != -1:
+            self._placed[idx] = 1
+            try:
+                self.manager.control.getListItem(idx).setProperties(self.propertiesFor(self._items[idx]))
+            except RuntimeError:
+                pass
+            idx = self._placed.find(0, idx + 1, top)
+
+    def materialize(self):
+        return self[:]
+
+    def release(self, idx):
+        """
+        Return a materialized position to its placeholder state and drop its data source. The ManagedListItem itself
+        stays in place, as callers may still hold on to it.
+        """
+        mli = self._items[idx]
+        if isinstance(mli, int):
+            return False
+
+        placeholder = self.propertiesFor(idx)
+        with mli.batch():
+            mli.setLabel('')
+            mli.setLabel2('')
+            mli.setThumbnailImage('')
+            for k in set(mli.properties) | set(placeholder):
+                mli.setProperty(k, placeholder.get(k, ''))
+        mli.dataSource = None
+        return True
+
+
+class ReplaceStats(object):
+    """
+    Counts what ManagedControlList.replaceItems actually wrote to the control compared to a full rewrite.
+    """
+    def __init__(self):
+        self.calls = 0
+        self.rows = 0
+        self.rowsWritten = 0
+        self.properties = 0
+        self.propertiesWritten = 0
+
+    def __repr__(self):
+        return '<ReplaceStats calls={0} rows={1}/{2} properties={3}/{4}>'.format(
+            self.calls, self.rowsWritten, self.rows, self.propertiesWritten, self.properties
+        )
+
+
+REPLACE_STATS = ReplaceStats()
+
+
+def itemKey(mli):
+    if not mli:
+        return None
+    return getattr(mli.dataSource, 'ratingKey', None) or None
+
+
+def diffItems(old, new):
+    """
+    Keyed diff of two item lists by their dataSource's ratingKey. Returns (inserted, removed, moved) key counts;
+    items without a key count as inserted/removed.
+    """
+    oldPositions = {}
+    for idx, mli in enumerate(old):
+        key = itemKey(mli)
+        if key:
+            oldPositions[key] = idx
+
+    inserted = moved = 0
+    newKeys = set()
+    for idx, mli in enumerate(new):
+        key = itemKey(mli)
+        newKeys.add(key)
+        if key not in oldPositions:
+            inserted += 1
+        elif oldPositions[key] != idx:
+            moved += 1
+
+    removed = len([mli for mli in old if itemKey(mli) not in newKeys])
+    return inserted, removed, moved
+
+
 class ManagedControlList(object):
     __slots__ = ("controlID", "control", "items", "_sortKey", "_idCounter", "_maxViewIndex", "_properties",
                  "dataSource")
@@ -577,8 +891,12 @@ class ManagedControlList(object):
             bottom = 0
             top = self.size()
 
+        virtual = isinstance(self.items, VirtualItems)
         try:
             for idx in range(bottom, top):
+                if virtual and not self.items.isMaterialized(idx):
+                    continue
+
                 try:
                     li = self.control.getListItem(idx)
                 except RuntimeError:
@@ -604,6 +922,11 @@ class ManagedControlList(object):
     def reInit(self, window, control_id):
         self.controlID = control_id
         self.control = window.getControl(control_id)
+        if isinstance(self.items, VirtualItems):
+            self.control.addItems(self.items.listItems())
+            self._updateItems()
+            self.placeVirtualItems()
+            return
         self.control.addItems([i._takeListItem(self, self._nextID()) for i in self.items])
 
     def setSort(self, sort):
@@ -617,6 +940,44 @@ class ManagedControlList(object):
         self.items += managed_items
         self.control.addItems([i._takeListItem(self, self._nextID()) for i in managed_items])
 
+    def addVirtualItems(self, size, properties):
+        """
+        Fill an empty list with size placeholder positions whose ManagedListItems are created on first access.
+        properties(pos) returns the properties of the placeholder at pos.
+        """
+        self.items = VirtualItems(self, size, properties)
+        if size:
+            self._properties.update(self.items.propertiesFor(0))
+        self.control.addItems(self.items.listItems())
+        self.placeVirtualItems()
+
+    def placeVirtualItems(self, bottom=None, top=None):
+        """
+        Give the placeholder positions of a virtual list from bottom to top their properties, by default those around
+        the selected position.
+        """
+        if not isinstance(self.items, VirtualItems):
+            return
+
+        if bottom is None:
+            pos = max(self.control.getSelectedPosition(), 0)
+            bottom, top = pos - VirtualItems.WINDOW, pos + VirtualItems.WINDOW
+
+        self.items.place(bottom, top)
+
+    def releaseItem(self, pos):
+        """
+        Return the item at pos of a virtual list to its placeholder state. Returns whether it held anything.
+        """
+        if not isinstance(self.items, VirtualItems):
+            return False
+
+        return self.items.release(pos)
+
+    def _materialize(self):
+        if isinstance(self.items, VirtualItems):
+            self.items = self.items.materialize()
+
     def replaceItem(self, pos, mli):
         self[pos].onDestroy()
         self[pos].invalidate()
@@ -627,15 +988,28 @@ class ManagedControlList(object):
         mli._updateListItem()
 
     def replaceItems(self, managed_items):
+        """
+        Replace the items, writing only the labels, art and properties of rows that differ from what the control
+        shows. Kodi can't move or insert rows, so every row is compared to the item previously shown at its position.
+        """
         if not self.items:
             self.addItems(managed_items)
             return True
 
         oldSize = self.size()
+        if isinstance(self.items, VirtualItems):
+            old = [self.items.isMaterialized(idx) and self.items[idx] or None for idx in range(oldSize)]
+        else:
+            old = list(self.items)
+
+        inserted, removed, moved = diffItems(old, managed_items)
+        states = [mli and mli._rowState() for mli in old]
 
+        kept = set(managed_items)
         for i in self.items:
-            i.onDestroy()
-            i.invalidate()
+            if i not in kept:
+                i.onDestroy()
+                i.invalidate()
 
         self.items = managed_items
         size = self.size()
@@ -658,7 +1032,51 @@ class ManagedControlList(object):
             elif pos >= size:
                 self.selectItem(size - 1)
 
-        return self._updateItems(0, self.size())
+        rows, properties = REPLACE_STATS.rowsWritten, REPLACE_STATS.propertiesWritten
+        result = self._updateItemDeltas(old, states)
+        util.DEBUG_LOG('ManagedControlList({0}): replaced {1} items (inserted: {2}, removed: {3}, moved: {4}), '
+                       'wrote {5} rows and {6} properties', self.controlID, size, inserted, removed, moved,
+                       REPLACE_STATS.rowsWritten - rows, REPLACE_STATS.propertiesWritten - properties)
+        return result
+
+    def _updateItemDeltas(self, old, states):
+        REPLACE_STATS.calls += 1
+        for idx, mli in enumerate(self.items):
+            mli.properties['index'] = str(idx)
+            self._properties.update(mli.properties)
+
+        try:
+            for idx, mli in enumerate(self.items):
+                previous = idx < len(old) and states[idx] or None
+                REPLACE_STATS.rows += 1
+                if idx < len(old) and old[idx] is mli:
+                    REPLACE_STATS.properties += len(self._properties)
+                    continue
+
+                try:
+                    li = self.control.getListItem(idx)
+                except RuntimeError:
+                    continue
+
+                REPLACE_STATS.properties += len(self._properties)
+                mli._manager = self
+                mli._listItem = li
+                if previous is None:
+                    mli._ID = self._nextID()
+                    mli._updateListItem()
+                    REPLACE_STATS.rowsWritten += 1
+                    REPLACE_STATS.propertiesWritten += len(self._properties)
+                    continue
+
+                mli._ID = previous[0]
+                properties, written = mli._updateListItemFrom(previous)
+                REPLACE_STATS.rowsWritten += written
+                REPLACE_STATS.propertiesWritten += properties
+        except RuntimeError:
+            util.ERROR('kodigui.ManagedControlList._updateItemDeltas: Runtime error')
+            return False
+
+        return True
 
     def getListItem(self, pos):
         li = self.control.getListItem(pos)
@@ -716,6 +1134,7 @@ class ManagedControlList(object):
         self.removeItem(mli.pos())
 
     def insertItem(self, index, managed_item):
+        self._materialize()
         pos = self.getSelectedPosition() + 1
 
         if index >= self.size() or index < 0:
@@ -729,6 +1148,7 @@ class ManagedControlList(object):
             self.selectItem(pos)
 
     def moveItem(self, mli, dest_idx):
+        self._materialize()
         source_idx = mli.pos()
         if source_idx < dest_idx:
             rstart = source_idx
@@ -743,6 +1163,7 @@ class ManagedControlList(object):
         self._updateItems(rstart, rend)
 
     def swapItems(self, pos1, pos2):
+        self._materialize()
         if not self.positionIsValid(pos1) or not self.positionIsValid(pos2):
             return False
 
@@ -815,6 +1236,7 @@ class ManagedControlList(object):
         return 0 <= pos < self.size()
 
     def sort(self, sort=None, reverse=False):
+        self._materialize()
         sort = sort or self._sortKey
 
         self.items.sort(key=sort, reverse=reverse)
@@ -822,6 +1244,7 @@ class ManagedControlList(object):
         self._updateItems(0, self.size())
 
     def reverse(self):
+        self._materialize()
         self.items.reverse()
         self._updateItems(0, self.size())
 
@@ -848,8 +1271,12 @@ class ManagedControlList(object):
     def newControl(self, window=None, control_id=None):
         self.controlID = control_id or self.controlID
         self.control = window.getControl(self.controlID)
-        self.control.addItems([xbmcgui.ListItem() for i in range(self.size())])
+        if isinstance(self.items, VirtualItems):
+            self.control.addItems(self.items.listItems())
+        else:
+            self.control.addItems([xbmcgui.ListItem() for i in range(self.size())])
         self._updateItems()
+        self.placeVirtualItems()
 
 
 class _MWBackground(ControlledWindow):
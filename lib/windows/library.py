@@ -1,9 +1,12 @@
 from __future__ import absolute_import
 
+import bisect
+import contextlib
 import json
 import os
 import random
 import threading
+import time
 
 import plexnet
 import six
@@ -13,10 +16,12 @@ import six.moves.urllib.request
 from kodi_six import xbmc
 from kodi_six import xbmcgui
 from plexnet import playqueue
+from plexnet import threadutils
 from six.moves import range
 
 from lib import backgroundthread
 from lib import player
+from lib import section_cache
 from lib import util
 from lib.util import T
 from . import busy
@@ -160,6 +165,15 @@ SORT_KEYS = {
 ITEM_TYPE = None
 
 
+# Chunk sizes fill whole rows in every view (multiples of 6, 10 and 12)
+CHUNK_SIZES = (60, 120, 180, 240, 360, 540)
+# rough size of one item in a section listing, and how long fetching a chunk should take when adapting its size
+CHUNK_ITEM_BYTES = 2500
+CHUNK_TARGET_TIME = 1.0
+# items of a section view stored in its snapshot, enough to fill the first screen of every view
+SNAPSHOT_ITEMS = 36
+
+
 def setItemType(type_=None):
     assert type_ is not None, "Invalid type: None"
     global ITEM_TYPE
@@ -168,7 +182,8 @@ def setItemType(type_=None):
 
 
 class ChunkRequestTask(backgroundthread.Task):
-    def setup(self, section, start, size, callback, filter_=None, sort=None, unwatched=False, subDir=False):
+    def setup(self, section, start, size, callback, filter_=None, sort=None, unwatched=False, subDir=False,
+              timing_callback=None):
         self.section = section
         self.start = start
         self.size = size
@@ -177,15 +192,21 @@ class ChunkRequestTask(backgroundthread.Task):
         self.sort = sort
         self.unwatched = unwatched
         self.subDir = subDir
+        self.timingCallback = timing_callback
+        self.started = False
         return self
 
     def contains(self, pos):
         return self.start <= pos <= (self.start + self.size)
 
+    def dedupeKey(self):
+        return self.callback, self.start, self.size, self.filter, self.sort, self.unwatched, self.subDir
+
     def run(self):
         if self.isCanceled():
             return
 
+        self.started = True
         try:
             type_ = None
             if ITEM_TYPE == 'episode':
@@ -195,11 +216,17 @@ class ChunkRequestTask(backgroundthread.Task):
             elif ITEM_TYPE == 'collection':
                 type_ = 18
 
+            start = time.time()
             if ITEM_TYPE == 'folder':
                 items = self.section.folder(self.start, self.size, self.subDir)
             else:
                 items = self.section.all(self.start, self.size, self.filter, self.sort, self.unwatched, type_=type_)
 
+            elapsed = time.time() - start
+            util.DEBUG_LOG('Library: Chunk {0}+{1} fetched in {2:.2f}s', self.start, self.size, elapsed)
+            if self.timingCallback:
+                self.timingCallback(elapsed)
+
             if self.isCanceled():
                 return
             self.callback(items, self.start)
@@ -207,6 +234,153 @@ class ChunkRequestTask(backgroundthread.Task):
             util.DEBUG_LOG('404 on section: {0}', repr(self.section.title))
 
 
+class ChunkPrefetcher(object):
+    """
+    Tracks scroll direction and speed over the poster panel to pick the chunks to fetch ahead of the focused one.
+    The lookahead covers the items the user will scroll past while a chunk is being fetched, based on the measured
+    chunk latency.
+    """
+    MAX_LOOKAHEAD = 4
+    IDLE_TIMEOUT = 1.0
+
+    def __init__(self, chunk_size):
+        self.chunkSize = chunk_size
+        self.velocity = 0.0
+        self.latency = None
+        self._lastPos = None
+        self._lastTime = 0
+
+    def update(self, pos):
+        now = time.time()
+        if self._lastPos is not None:
+            delta = pos - self._lastPos
+            elapsed = max(now - self._lastTime, 0.01)
+            if abs(delta) >= self.chunkSize:
+                # a jump, not a scroll
+                self.velocity = 0.0
+            elif elapsed > self.IDLE_TIMEOUT or (delta > 0) != (self.velocity > 0):
+                self.velocity = delta / elapsed
+            else:
+                self.velocity = 0.5 * self.velocity + 0.5 * delta / elapsed
+
+        self._lastPos = pos
+        self._lastTime = now
+
+    def addTiming(self, seconds):
+        self.latency = seconds if self.latency is None else 0.7 * self.latency + 0.3 * seconds
+
+    def lookahead(self):
+        if not self.velocity:
+            return 0
+
+        covered = abs(self.velocity) * (self.latency or 1.0)
+        return min(self.MAX_LOOKAHEAD, int(covered // self.chunkSize) + 1)
+
+    def chunks(self, pos):
+        """
+        Start positions of the chunks to prefetch for pos, nearest first, in the scroll direction.
+        """
+        step = self.velocity > 0 and self.chunkSize or -self.chunkSize
+        base = (pos // self.chunkSize) * self.chunkSize
+        return [base + step * (i + 1) for i in range(self.lookahead())]
+
+
+class BulkChunkLoader(object):
+    """
+    Loads every chunk of a section up front (retrieve all media up front) over a bounded number of parallel requests
+    per server. Chunks are fetched and parsed on pool threads; a single applier thread hands whatever has arrived to
+    the window in position order, so the UI lock is taken once per batch instead of once per chunk.
+    """
+    PARALLEL = 3
+
+    _semaphores = {}
+    _semaphoresLock = threading.Lock()
+
+    def __init__(self, server, apply_callback, progress_callback):
+        self.applyCallback = apply_callback
+        self.progressCallback = progress_callback
+        self.semaphore = self.serverSemaphore(server)
+        self.pool = threadutils.WorkerPool('LIBRARY-BULK', max_workers=self.PARALLEL, idle_timeout=5)
+        self.tasks = []
+        self.results = {}
+        self.done = 0
+        self.canceled = False
+        self.condition = threading.Condition()
+
+    @classmethod
+    def serverSemaphore(cls, server):
+        with cls._semaphoresLock:
+            return cls._semaphores.setdefault(server.uuid, threading.BoundedSemaphore(cls.PARALLEL))
+
+    def add(self, task):
+        self.tasks.append(task)
+
+    def onChunk(self, items, start):
+        with self.condition:
+            self.results[start] = items
+            self.condition.notify()
+
+    def start(self):
+        self.started = time.time()
+        for task in self.tasks:
+            self.pool.submit(self._fetch, task)
+
+        thread = threading.Thread(target=self._applyLoop, name='LIBRARY-BULK-APPLY')
+        thread.daemon = True
+        thread.start()
+
+    def cancel(self):
+        with self.condition:
+            self.canceled = True
+            self.condition.notify()
+
+        for task in self.tasks:
+            task.cancel()
+        self.pool.shutdown()
+
+    def _fetch(self, task):
+        try:
+            if self.canceled or task.isCanceled():
+                return
+
+            with self.semaphore, task.token:
+                task.run()
+        finally:
+            task.finished = True
+            with self.condition:
+                self.done += 1
+                self.condition.notify()
+
+    def _applyLoop(self):
+        total = len(self.tasks)
+        loaded = 0
+        try:
+            while True:
+                with self.condition:
+                    while not self.results and self.done < total and not self.canceled:
+                        self.condition.wait()
+
+                    if self.canceled or (not self.results and self.done >= total):
+                        break
+
+                    batch = sorted(self.results.items())
+                    self.results = {}
+
+                self.applyCallback(batch)
+                loaded += sum(len(items) for start, items in batch if items)
+                self.progressCallback(loaded, False)
+
+            if not self.canceled:
+                self.progressCallback(loaded, True)
+        except:
+            util.ERROR()
+        finally:
+            self.pool.shutdown()
+
+        util.DEBUG_LOG('Library: Bulk load of {0} chunks finished in {1:.2f}s (canceled: {2})', total,
+                       time.time() - self.started, self.canceled)
+
+
 class PhotoPropertiesTask(backgroundthread.Task):
     def setup(self, photo, callback):
         self.photo = photo
@@ -224,6 +398,27 @@ class PhotoPropertiesTask(backgroundthread.Task):
             util.DEBUG_LOG('404 on photo reload: {0}', self.photo)
 
 
+class SectionLayoutTask(backgroundthread.Task):
+    def setup(self, layout, callback):
+        self.layout = layout
+        self.callback = callback
+        return self
+
+    def run(self):
+        if self.isCanceled():
+            return
+
+        try:
+            layout = self.layout()
+        except plexnet.exceptions.BadRequest:
+            util.DEBUG_LOG('404 on section layout')
+            return
+
+        if self.isCanceled():
+            return
+        self.callback(layout)
+
+
 class LibrarySettings(object):
     def __init__(self, section_or_server_id, ignoreLibrarySettings=False):
         self.ignoreLibrarySettings = ignoreLibrarySettings
@@ -319,6 +514,15 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
         self.keyItems = {}
         self.firstOfKeyItems = {}
         self.tasks = backgroundthread.Tasks()
+        self.bulkLoader = None
+        self.snapshotLayout = None
+        self.snapshotFilled = False
+        self.snapshotKeys = {}
+        self.jumpIndex = None
+        self.jumpIndexKey = None
+        self.layoutJumpList = None
+        self.pendingIndex = None
+        self.localItems = None
         self.backgroundSet = False
         self.showPanelControl = None
         self.keyListControl = None
@@ -347,9 +551,14 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
         self.sortDesc = self.librarySettings.getSetting('sort.desc', False)
 
         self.alreadyFetchedChunkList = set()
+        self.loadedChunks = set()
+        self.focusPosition = 0
         self.finalChunkPosition = 0
+        self.sectionIndex = None
 
         self.CHUNK_SIZE = util.addonSettings.libraryChunkSize
+        self.prefetcher = ChunkPrefetcher(self.CHUNK_SIZE)
+        self.prefetchTasks = {}
 
         key = self.section.key
         if not key.isdigit():
@@ -365,6 +574,7 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
 
     @busy.dialog()
     def doClose(self):
+        self.cancelBulkLoad()
         self.tasks.kill()
         kodigui.MultiWindow.doClose(self)
 
@@ -412,6 +622,7 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
                 mli = self.showPanelControl.getSelectedItem()
                 if mli:
                     self.requestChunk(mli.pos())
+                    self.prefetchChunks(mli.pos())
 
                 if util.addonSettings.dynamicBackgrounds:
                     if mli and mli.dataSource:
@@ -615,6 +826,7 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
         if choice == ITEM_TYPE:
             return
 
+        self.cancelBulkLoad()
         with self.lock:
             if self.tasks and any(list(filter(lambda x: not x.finished, self.tasks))):
                 util.DEBUG_LOG("Waiting for tasks to finish")
@@ -986,6 +1198,8 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
 
     def updateUnwatchedAndProgress(self, mli):
         mli.dataSource.reload()
+        if self.sectionIndex:
+            self.sectionIndex.updateObject(mli.dataSource)
         if mli.dataSource.isWatched:
             mli.setProperty('unwatched', '')
             mli.setBoolProperty('watched', mli.dataSource.isFullyWatched)
@@ -1063,14 +1277,86 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
     def fillShows(self):
         self.setBoolProperty('no.content', False)
         self.setBoolProperty('no.content.filtered', False)
-        items = []
-        jitems = []
-        self.keyItems = {}
-        self.firstOfKeyItems = {}
-        totalSize = 0
         self.alreadyFetchedChunkList = set()
+        self.loadedChunks = set()
+        self.focusPosition = 0
         self.finalChunkPosition = 0
+        self.prefetchTasks = {}
+        self.cancelBulkLoad()
+        # whatever is still queued for the previous view would fill it with stale items
+        backgroundthread.BGThreader.cancelGroup(self)
+        self.snapshotLayout = None
+        self.snapshotFilled = False
+        self.snapshotKeys = {}
+        self.jumpIndex = None
+        self.jumpIndexKey = None
+        self.pendingIndex = None
+        self.localItems = None
+
+        if self.fillLocal():
+            return
+
+        view = self.snapshotView()
+        snapshot = view and util.addonSettings.librarySnapshots and section_cache.snapshots.get(self.section, view)
+        if snapshot:
+            util.DEBUG_LOG('Library: Painting {0} items from snapshot, verifying layout', len(snapshot.items))
+            self.fillLayout(snapshot.totalSize, snapshot.jumpList, snapshotItems=snapshot.items)
+            task = SectionLayoutTask().setup(self.sectionLayout, lambda layout: self._verifySnapshot(snapshot, layout))
+            self.tasks.add(task)
+            backgroundthread.BGThreader.addTasksToFront([task], group=self)
+            return
+
+        layout = self.sectionLayout(withChunk=True)
+        if layout is None:
+            self.showNoContent()
+            util.messageDialog("Error", "There was an error.")
+            return
+
+        self.snapshotLayout = view and layout[:2]
+        self.fillLayout(*layout)
+
+    def isIndexView(self):
+        """
+        Whether the current view is a section's unfiltered main view, which a SectionIndex can be built from.
+        """
+        return (self.section.TYPE in ('movie', 'show') and ITEM_TYPE in (None, self.section.TYPE) and not self.subDir
+                and not self.filter and not self.filterUnwatched)
+
+    def fillLocal(self):
+        """
+        Fill the current view from the section's index instead of the server, if the index can answer it.
+        """
+        index = self.sectionIndex
+        if not index or index.itemType != ITEM_TYPE or not util.addonSettings.libraryLocalIndex or self.subDir:
+            return False
+
+        filter_ = self.getFilterOpts()
+        if self.filter and not filter_:
+            return False
+
+        sort = self.getSortOpts()
+        if not index.canAnswer(sort, filter_, self.filterUnwatched):
+            return False
 
+        started = time.time()
+        rows = index.query(sort, filter_, self.filterUnwatched)
+        self.localItems = [index.objects[r] for r in rows]
+        jumpList = self.usesJumpList() and index.jumpList(rows) or []
+        util.DEBUG_LOG('Library: Answered view from the local index in {0:.1f}ms ({1} of {2} items)',
+                       (time.time() - started) * 1000.0, len(rows), index.totalSize)
+
+        self.fillLayout(len(rows), jumpList)
+        return True
+
+    def usesJumpList(self):
+        return not (self.sort != 'titleSort' or ITEM_TYPE == 'folder' or self.subDir or self.section.TYPE == "collection")
+
+    def sectionLayout(self, withChunk=False):
+        """
+        Query the total size and jump list ((title, key, size) per entry) of the current view.
+        Returns (totalSize, jumpList, firstChunk), or None if the jump list couldn't be retrieved. With a stored
+        JumpIndex for the view only its total size is checked, using the first chunk's request if withChunk is set.
+        """
         type_ = None
         if ITEM_TYPE == 'episode':
             type_ = 4
@@ -1079,98 +1365,276 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
         elif ITEM_TYPE == 'collection':
             type_ = 18
 
-        idx = 0
-        fallback = 'script.plex/thumb_fallbacks/{0}.png'.format(TYPE_KEYS.get(self.section.type, TYPE_KEYS['movie'])['fallback'])
-
-        if self.sort != 'titleSort' or ITEM_TYPE == 'folder' or self.subDir or self.section.TYPE == "collection":
+        if not self.usesJumpList():
             if ITEM_TYPE == 'folder':
                 sectionAll = self.section.folder(0, 0, self.subDir)
             else:
                 sectionAll = self.section.all(0, 0, filter_=self.getFilterOpts(), sort=self.getSortOpts(), unwatched=self.filterUnwatched, type_=type_)
 
-            totalSize = sectionAll.totalSize.asInt()
+            return sectionAll.totalSize.asInt(), [], None
+
+        view = self.snapshotView()
+        index = None
+        if view and util.addonSettings.librarySnapshots:
+            self.jumpIndexKey = self.viewKey(type_)
+            index = section_cache.snapshots.getJumpIndex(self.section, view)
+        if index:
+            if withChunk:
+                self.CHUNK_SIZE = self.prefetcher.chunkSize = self.chunkSize()
+            chunk = self.section.all(0, withChunk and self.CHUNK_SIZE or 0, filter_=self.getFilterOpts(), sort=self.getSortOpts(), unwatched=self.filterUnwatched, type_=type_)
+            if chunk.totalSize.asInt() == index.totalSize and index.viewKey == self.jumpIndexKey:
+                util.DEBUG_LOG('Library: Using the local jump list index ({0} items)', index.totalSize)
+                return index.totalSize, index.jumpList, withChunk and chunk or None
+
+            util.DEBUG_LOG('Library: Local jump list index is outdated ({0} vs. {1} items, {2} vs. {3})',
+                           index.totalSize, chunk.totalSize.asInt(), index.viewKey, self.jumpIndexKey)
+
+        jumpList = self.section.jumpList(filter_=self.getFilterOpts(), sort=self.getSortOpts(), unwatched=self.filterUnwatched, type_=type_)
+        if jumpList is None:
+            return None
 
-            if not totalSize:
-                self.showPanelControl.reset()
-                self.keyListControl.reset()
+        return sum(ji.size.asInt() for ji in jumpList), [[ji.title, ji.key, ji.size.asInt()] for ji in jumpList], None
 
-                if self.filter or self.filterUnwatched:
-                    self.setBoolProperty('no.content.filtered', True)
-                else:
-                    self.setBoolProperty('no.content', True)
-            else:
-                for x in range(totalSize):
-                    mli = kodigui.ManagedListItem('')
-                    mli.setProperty('thumb.fallback', fallback)
-                    mli.setProperty('index', str(x))
-                    items.append(mli)
-        else:
-            jumpList = self.section.jumpList(filter_=self.getFilterOpts(), sort=self.getSortOpts(), unwatched=self.filterUnwatched, type_=type_)
+    def viewKey(self, type_=None):
+        """
+        What the contents of the current view depend on besides its size: the section's version and, for unwatched
+        views, when anything in the section was last watched, as watching something doesn't change the version.
+        """
+        key = section_cache.SectionSnapshotCache.sectionVersion(self.section)
+        if not self.filterUnwatched:
+            return key
 
-            if not jumpList:
-                self.showPanelControl.reset()
-                self.keyListControl.reset()
+        lastViewed = self.section.all(0, 1, sort=('lastViewedAt', 'desc'), type_=type_)
+        return '{0} {1}'.format(key, lastViewed and lastViewed[0].get('lastViewedAt').asInt() or 0)
 
-                if self.filter or self.filterUnwatched:
-                    self.setBoolProperty('no.content.filtered', True)
-                else:
-                    self.setBoolProperty('no.content', True)
+    def showNoContent(self):
+        self.showPanelControl.reset()
+        self.keyListControl.reset()
 
-                if jumpList is None:
-                    util.messageDialog("Error", "There was an error.")
+        if self.filter or self.filterUnwatched:
+            self.setBoolProperty('no.content.filtered', True)
+        else:
+            self.setBoolProperty('no.content', True)
 
-                return
+    def fillLayout(self, totalSize, jumpList, firstChunk=None, snapshotItems=None):
+        jitems = []
+        keys = []
+        keyStarts = []
+        self.keyItems = {}
+        self.firstOfKeyItems = {}
 
-            for kidx, ji in enumerate(jumpList):
-                mli = kodigui.ManagedListItem(ji.title, data_source=ji.key)
-                mli.setProperty('key', ji.key)
+        fallback = 'script.plex/thumb_fallbacks/{0}.png'.format(TYPE_KEYS.get(self.section.type, TYPE_KEYS['movie'])['fallback'])
+
+        if not totalSize:
+            self.showNoContent()
+
+        if jumpList:
+            position = 0
+            for kidx, (title, key, size) in enumerate(jumpList):
+                mli = kodigui.ManagedListItem(title, data_source=key)
+                mli.setProperty('key', key)
                 mli.setProperty('original', '{0:02d}'.format(kidx))
-                self.keyItems[ji.key] = mli
+                self.keyItems[key] = mli
                 jitems.append(mli)
-                totalSize += ji.size.asInt()
+                if size:
+                    keyStarts.append(position)
+                    keys.append(key)
+                position += size
+
+            util.setGlobalProperty('key', jumpList[0][1])
 
-                for x in range(ji.size.asInt()):
-                    mli = kodigui.ManagedListItem('')
-                    mli.setProperty('key', ji.key)
-                    mli.setProperty('thumb.fallback', fallback)
-                    mli.setProperty('index', str(idx))
-                    items.append(mli)
-                    if not x:  # i.e. first item
-                        self.firstOfKeyItems[ji.key] = mli
-                    idx += 1
+        self.layoutJumpList = jumpList
+        if self.localItems is None:
+            if totalSize and jumpList and self.snapshotView():
+                self.jumpIndex = section_cache.JumpIndex(totalSize)
 
-            util.setGlobalProperty('key', jumpList[0].key)
+            # the index would hold on to every item the memory budget evicts
+            if totalSize and self.isIndexView() and util.addonSettings.libraryLocalIndex and not self.loadedItemsMax():
+                self.pendingIndex = section_cache.SectionIndex(totalSize, ITEM_TYPE, self.getSortOpts())
+
+        def properties(pos):
+            props = {'thumb.fallback': fallback, 'index': str(pos)}
+            if keys:
+                props['key'] = keys[bisect.bisect_right(keyStarts, pos) - 1]
+            return props
 
         self.setProperty("items.count", str(totalSize))
 
         self.showPanelControl.reset()
         self.keyListControl.reset()
 
-        self.showPanelControl.addItems(items)
+        # only positions that get accessed (viewport, incoming chunks, jump targets) get a ManagedListItem
+        self.showPanelControl.addVirtualItems(totalSize, properties)
         self.keyListControl.addItems(jitems)
 
+        for key, start in zip(keys, keyStarts):
+            self.firstOfKeyItems[key] = self.showPanelControl[start]
+
+        if snapshotItems:
+            self.paintSnapshot(snapshotItems)
+
         self.showPanelControl.selectItem(0)
         self.setFocusId(self.POSTERS_PANEL_ID)
 
-        tasks = []
-        for startChunkPosition in range(0, totalSize, self.CHUNK_SIZE):
-            tasks.append(
-                ChunkRequestTask().setup(
-                    self.section, startChunkPosition, self.CHUNK_SIZE, self._chunkCallback, filter_=self.getFilterOpts(), sort=self.getSortOpts(), unwatched=self.filterUnwatched, subDir=self.subDir
-                )
+        if self.localItems is not None:
+            self.finalChunkPosition = (totalSize // self.CHUNK_SIZE) * self.CHUNK_SIZE
+            self.requestChunk(0)
+            return
+
+        if firstChunk is None:
+            self.CHUNK_SIZE = self.prefetcher.chunkSize = self.chunkSize()
+        else:
+            # fetched along with the layout
+            self.alreadyFetchedChunkList.add(0)
+            self._chunkCallback(firstChunk, 0)
+
+        if util.addonSettings.retrieveAllMediaUpFront:
+            self.bulkLoad(totalSize, start=firstChunk is None and 0 or self.CHUNK_SIZE)
+            return
+
+        # If we're retrieving media as we navigate then we just want to request the first
+        # chunk of media and stop.  We'll fetch the rest as the user navigates to those items
+        if totalSize:
+            # Calculate the end chunk's starting position based on the totalSize of items
+            self.finalChunkPosition = (totalSize // self.CHUNK_SIZE) * self.CHUNK_SIZE
+            if firstChunk is None:
+                backgroundthread.BGThreader.addTasksToFront([self._chunkTask(0)], group=self)
+
+    def snapshotView(self):
+        """
+        Everything that determines the contents of the current view, or None if it shouldn't be snapshotted.
+        """
+        if ITEM_TYPE == 'folder' or self.subDir:
+            return None
+
+        return {"type": ITEM_TYPE, "sort": self.getSortOpts(), "filter": self.getFilterOpts(),
+                "unwatched": self.filterUnwatched}
+
+    def paintSnapshot(self, items):
+        for pos, (label, label2, thumb, properties) in enumerate(items[:len(self.showPanelControl)]):
+            mli = self.showPanelControl[pos]
+            # the live items won't necessarily set all of these again
+            self.snapshotKeys[pos] = set(properties) - set(mli.properties)
+            with mli.batch():
+                mli.setLabel(label)
+                mli.setLabel2(label2)
+                mli.setThumbnailImage(thumb)
+                for k, v in properties.items():
+                    mli.setProperty(k, v)
+
+    def _verifySnapshot(self, snapshot, layout):
+        if layout is None:
+            return
+
+        if [snapshot.totalSize, snapshot.jumpList] == [layout[0], layout[1]]:
+            util.DEBUG_LOG('Library: Snapshot layout is current')
+            self.snapshotLayout = layout[:2]
+            with self.lock:
+                self.storeSnapshot()
+            return
+
+        util.DEBUG_LOG('Library: Snapshot layout is outdated ({0} vs. {1} items), refilling', snapshot.totalSize,
+                       layout[0])
+        self.tasks.cancel()
+        self.alreadyFetchedChunkList = set()
+        self.prefetchTasks = {}
+        self.cancelBulkLoad()
+        with self.lock:
+            self.snapshotLayout = layout[:2]
+            self.snapshotFilled = False
+            self.snapshotKeys = {}
+            self.fillLayout(*layout)
+
+    def storeSnapshot(self):
+        """
+        Store the layout and first screenful of the current view once both come from the server.
+        """
+        if not self.snapshotLayout or not self.snapshotFilled or not util.addonSettings.librarySnapshots:
+            return
+
+        items = []
+        for pos in range(min(SNAPSHOT_ITEMS, len(self.showPanelControl))):
+            mli = self.showPanelControl[pos]
+            items.append((mli.label, mli.label2, mli.thumbnailImage, mli.properties))
+
+        totalSize, jumpList = self.snapshotLayout
+        self.snapshotLayout = None
+        section_cache.snapshots.set(self.section, self.snapshotView(), section_cache.SectionSnapshot(totalSize, jumpList, items))
+
+    def storeJumpIndex(self):
+        """
+        Store the locally built jump list of the current view once every item is known, if it matches the server's.
+        """
+        if not self.jumpIndex or not self.jumpIndex.isComplete():
+            return
+
+        index, self.jumpIndex = self.jumpIndex, None
+        if index.jumpList != self.layoutJumpList:
+            util.DEBUG_LOG('Library: Local jump list doesn\'t match the server\'s, not storing it')
+            return
+
+        if util.addonSettings.librarySnapshots:
+            index.viewKey = self.jumpIndexKey
+            section_cache.snapshots.setJumpIndex(self.section, self.snapshotView(), index)
+
+    def storeSectionIndex(self):
+        """
+        Keep the section index of the current view once every item is known.
+        """
+        if not self.pendingIndex or not self.pendingIndex.isComplete():
+            return
+
+        self.sectionIndex, self.pendingIndex = self.pendingIndex, None
+        util.DEBUG_LOG('Library: Section index complete ({0} items, {1} collections)', self.sectionIndex.totalSize,
+                       self.sectionIndex.collections)
+
+    def bulkLoad(self, totalSize, start=0):
+        if start >= totalSize:
+            return
+
+        self.bulkLoader = BulkChunkLoader(
+            self.section.server, self._applyChunks,
+            lambda loaded, finished: self._bulkProgress(start + loaded, finished, totalSize)
+        )
+        for startChunkPosition in range(start, totalSize, self.CHUNK_SIZE):
+            task = ChunkRequestTask().setup(
+                self.section, startChunkPosition, self.CHUNK_SIZE, self.bulkLoader.onChunk, filter_=self.getFilterOpts(), sort=self.getSortOpts(), unwatched=self.filterUnwatched, subDir=self.subDir,
+                timing_callback=self.prefetcher.addTiming
             )
+            self.alreadyFetchedChunkList.add(startChunkPosition)
+            self.bulkLoader.add(task)
+            self.tasks.add(task)
 
-            # If we're retrieving media as we navigate then we just want to request the first
-            # chunk of media and stop.  We'll fetch the rest as the user navigates to those items
-            if not util.addonSettings.retrieveAllMediaUpFront:
-                # Calculate the end chunk's starting position based on the totalSize of items
-                self.finalChunkPosition = (totalSize // self.CHUNK_SIZE) * self.CHUNK_SIZE
-                # Keep track of the chunks we've already fetched by storing the chunk's starting position
-                self.alreadyFetchedChunkList.add(startChunkPosition)
-                break
+        self.setProperty("items.count", '{0}/{1}'.format(start, totalSize))
+        self.bulkLoader.start()
 
-        self.tasks.add(tasks)
-        backgroundthread.BGThreader.addTasksToFront(tasks)
+    def _bulkProgress(self, loaded, finished, totalSize):
+        if finished:
+            self.setProperty("items.count", str(totalSize))
+        else:
+            self.setProperty("items.count", '{0}/{1}'.format(min(loaded, totalSize), totalSize))
+
+    def cancelBulkLoad(self):
+        if self.bulkLoader:
+            self.bulkLoader.cancel()
+            self.bulkLoader = None
+
+    def chunkSize(self):
+        size = util.addonSettings.libraryChunkSize
+        if not util.addonSettings.libraryChunkSizeAdaptive:
+            return size
+
+        connection = self.section.server.activeConnection
+        if not connection or connection.transfers.expectedTime(CHUNK_ITEM_BYTES) is None:
+            util.DEBUG_LOG('Library: No connection measurements yet, using chunk size {0}', size)
+            return size
+
+        estimate = connection.transfers
+        fitting = [s for s in CHUNK_SIZES if estimate.expectedTime(s * CHUNK_ITEM_BYTES) <= CHUNK_TARGET_TIME]
+        size = fitting and fitting[-1] or CHUNK_SIZES[0]
+        util.DEBUG_LOG('Library: Chunk size {0} (expected {1:.2f}s per chunk, {2})', size,
+                       estimate.expectedTime(size * CHUNK_ITEM_BYTES), estimate)
+        return size
 
     def showPhotoItemProperties(self, photo):
         if photo.isFullObject():
@@ -1178,7 +1642,7 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
 
         task = PhotoPropertiesTask().setup(photo, self._showPhotoItemProperties)
         self.tasks.add(task)
-        backgroundthread.BGThreader.addTasksToFront([task])
+        backgroundthread.BGThreader.addTasksToFront([task], group=self)
 
     def _showPhotoItemProperties(self, photo):
         mli = self.showPanelControl.getSelectedItem()
@@ -1291,22 +1755,83 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
             util.setGlobalProperty('key', keys[0])
 
     def _chunkCallback(self, items, start):
-        if not self.showPanelControl or not items:
+        if not items:
+            # nothing arrived (e.g. the response broke off), so it can be requested again
+            self.alreadyFetchedChunkList.discard(start)
+            return
+
+        if not self.showPanelControl:
             return
 
         with self.lock:
-            pos = start
-            self.setBackground(items, pos, randomize=not util.addonSettings.dynamicBackgrounds)
+            started = time.time()
+            self._fillChunk(items, start)
+            util.DEBUG_LOG('Library: Filled chunk {0} in {1:.2f}ms per tile', start,
+                           (time.time() - started) * 1000.0 / len(items))
+            self.storeSnapshot()
+            self.storeJumpIndex()
+            self.storeSectionIndex()
+            self.evictChunks()
+
+    def _applyChunks(self, chunks):
+        """
+        Apply several fetched chunks under a single lock acquisition.
+        """
+        if not self.showPanelControl:
+            return
 
-            thumbDim = TYPE_KEYS.get(self.section.type, TYPE_KEYS['movie'])['thumb_dim']
-            artDim = TYPE_KEYS.get(self.section.type, TYPE_KEYS['movie']).get('art_dim', (256, 256))
+        with self.lock:
+            started = time.time()
+            tiles = 0
+            for start, items in chunks:
+                if items:
+                    self._fillChunk(items, start)
+                    tiles += len(items)
+
+            if tiles:
+                util.DEBUG_LOG('Library: Filled {0} chunks in {1:.2f}ms per tile', len(chunks),
+                               (time.time() - started) * 1000.0 / tiles)
+            self.storeSnapshot()
+            self.storeJumpIndex()
+            self.storeSectionIndex()
+
+    def _fillChunk(self, items, start):
+        if start == 0:
+            self.snapshotFilled = True
+
+        if self.localItems is None:
+            self.loadedChunks.add(start)
+
+        if self.jumpIndex:
+            self.jumpIndex.update(start, items)
+
+        if self.pendingIndex:
+            self.pendingIndex.update(start, items)
+
+        if self.snapshotKeys and start in self.snapshotKeys:
+            # replace the painted snapshot tiles with a single write each
+            snapshotKeys, self.snapshotKeys = self.snapshotKeys, {}
+            with contextlib.ExitStack() as stack:
+                for pos, keys in snapshotKeys.items():
+                    mli = stack.enter_context(self.showPanelControl[pos].batch())
+                    for k in keys:
+                        mli.setProperty(k, '')
+                self._fillChunk(items, start)
+            return
 
-            if ITEM_TYPE == 'episode':
-                for offset, obj in enumerate(items):
-                    if not self.showPanelControl:
-                        return
+        pos = start
+        self.setBackground(items, pos, randomize=not util.addonSettings.dynamicBackgrounds)
+
+        thumbDim = TYPE_KEYS.get(self.section.type, TYPE_KEYS['movie'])['thumb_dim']
+        artDim = TYPE_KEYS.get(self.section.type, TYPE_KEYS['movie']).get('art_dim', (256, 256))
+
+        if ITEM_TYPE == 'episode':
+            for offset, obj in enumerate(items):
+                if not self.showPanelControl:
+                    return
 
-                    mli = self.showPanelControl[pos]
+                mli = self.showPanelControl[pos]
+                with mli.batch():
                     if obj:
                         mli.dataSource = obj
                         mli.setProperty('index', str(pos))
@@ -1336,14 +1861,15 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
                         else:
                             mli.setProperty('index', '')
 
-                    pos += 1
+                pos += 1
 
-            elif ITEM_TYPE == 'album':
-                for offset, obj in enumerate(items):
-                    if not self.showPanelControl:
-                        return
+        elif ITEM_TYPE == 'album':
+            for offset, obj in enumerate(items):
+                if not self.showPanelControl:
+                    return
 
-                    mli = self.showPanelControl[pos]
+                mli = self.showPanelControl[pos]
+                with mli.batch():
                     if obj:
                         mli.dataSource = obj
                         mli.setProperty('index', str(pos))
@@ -1361,13 +1887,14 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
                         else:
                             mli.setProperty('index', '')
 
-                    pos += 1
-            else:
-                for offset, obj in enumerate(items):
-                    if not self.showPanelControl:
-                        return
+                pos += 1
+        else:
+            for offset, obj in enumerate(items):
+                if not self.showPanelControl:
+                    return
 
-                    mli = self.showPanelControl[pos]
+                mli = self.showPanelControl[pos]
+                with mli.batch():
                     if obj:
                         mli.setProperty('index', str(pos))
                         mli.setLabel(obj.defaultTitle or '')
@@ -1406,9 +1933,20 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
                         else:
                             mli.setProperty('index', '')
 
-                    pos += 1
+                pos += 1
 
     def requestChunk(self, start):
+        self.focusPosition = start
+        # placeholder tiles are only set up around where the panel is
+        self.showPanelControl.placeVirtualItems(start - self.CHUNK_SIZE, start + self.CHUNK_SIZE)
+        if self.localItems is not None:
+            startChunkPosition = (start // self.CHUNK_SIZE) * self.CHUNK_SIZE
+            if startChunkPosition not in self.alreadyFetchedChunkList:
+                self.alreadyFetchedChunkList.add(startChunkPosition)
+                self._chunkCallback(self.localItems[startChunkPosition:startChunkPosition + self.CHUNK_SIZE],
+                                    startChunkPosition)
+            return
+
         if util.addonSettings.retrieveAllMediaUpFront:
             return
 
@@ -1421,14 +1959,86 @@ class LibraryWindow(kodigui.MultiWindow, windowutils.UtilMixin):
         # Check if the chunk has already been requested, if not then go fetch the data
         if startChunkPosition not in self.alreadyFetchedChunkList:
             util.DEBUG_LOG('Position {0} so requesting chunk {1}', start, startChunkPosition)
-            # Keep track of the chunks we've already fetched by storing the chunk's starting position
-            self.alreadyFetchedChunkList.add(startChunkPosition)
-            task = ChunkRequestTask().setup(self.section, startChunkPosition, self.CHUNK_SIZE,
-                                            self._chunkCallback, filter_=self.getFilterOpts(), sort=self.getSortOpts(),
-                                            unwatched=self.filterUnwatched, subDir=self.subDir)
+            backgroundthread.BGThreader.addTasksToFront([self._chunkTask(startChunkPosition)], group=self)
+        elif startChunkPosition in self.prefetchTasks:
+            # a prefetched chunk became the focused one
+            task = self.prefetchTasks.pop(startChunkPosition)
+            if task.isValid():
+                backgroundthread.BGThreader.moveToFront(task)
 
-            self.tasks.add(task)
-            backgroundthread.BGThreader.addTasksToFront([task])
+    def loadedItemsMax(self):
+        """
+        How many items may stay loaded while browsing, or 0 for no limit. Views loaded up front keep everything.
+        """
+        if util.addonSettings.retrieveAllMediaUpFront:
+            return 0
+
+        return util.addonSettings.libraryLoadedItemsMax
+
+    def evictChunks(self):
+        """
+        Once more items than loadedItemsMax() are loaded, drop the data of the loaded chunks farthest from the focused
+        position. Their tiles go back to placeholders and requestChunk() fetches them again when they're revisited.
+        """
+        budget = self.loadedItemsMax()
+        if not budget or len(self.loadedChunks) * self.CHUNK_SIZE <= budget:
+            return
+
+        # always keep the focused chunk and its neighbours
+        keep = max(budget // self.CHUNK_SIZE, 3)
+        focused = (self.focusPosition // self.CHUNK_SIZE) * self.CHUNK_SIZE
+        chunks = sorted(self.loadedChunks, key=lambda c: abs(c - focused))
+
+        evicted = 0
+        for chunk in chunks[keep:]:
+            for pos in range(chunk, min(chunk + self.CHUNK_SIZE, len(self.showPanelControl))):
+                if self.showPanelControl.releaseItem(pos):
+                    evicted += 1
+            self.loadedChunks.discard(chunk)
+            self.alreadyFetchedChunkList.discard(chunk)
+
+        util.DEBUG_LOG('Library: Evicted {0} items of chunks {1} (focused: {2}, budget: {3})', evicted,
+                       sorted(chunks[keep:]), focused, budget)
+
+    def prefetchChunks(self, pos):
+        if util.addonSettings.retrieveAllMediaUpFront or self.localItems is not None:
+            return
+
+        self.prefetcher.update(pos)
+        wanted = [c for c in self.prefetcher.chunks(pos) if 0 <= c <= self.finalChunkPosition]
+
+        # drop queued prefetches the user is no longer heading towards so they can be requested again later
+        stale = backgroundthread.Tasks()
+        for chunk, task in list(self.prefetchTasks.items()):
+            if not task.isValid():
+                del self.prefetchTasks[chunk]
+            elif chunk not in wanted and not task.started:
+                stale.append(task)
+                del self.prefetchTasks[chunk]
+                self.alreadyFetchedChunkList.discard(chunk)
+        stale.cancel()
+
+        tasks = []
+        for chunk in wanted:
+            if chunk not in self.alreadyFetchedChunkList:
+                task = self._chunkTask(chunk)
+                self.prefetchTasks[chunk] = task
+                tasks.append(task)
+
+        if tasks:
+            util.DEBUG_LOG('Prefetching chunks {0} (velocity: {1:.1f} items/s, chunk latency: {2})',
+                           [t.start for t in tasks], self.prefetcher.velocity, self.prefetcher.latency)
+            backgroundthread.BGThreader.addTasks(tasks, group=self, lane=backgroundthread.VISIBLE)
+
+    def _chunkTask(self, startChunkPosition):
+        # Keep track of the chunks we've already fetched by storing the chunk's starting position
+        self.alreadyFetchedChunkList.add(startChunkPosition)
+        task = ChunkRequestTask().setup(self.section, startChunkPosition, self.CHUNK_SIZE,
+                                        self._chunkCallback, filter_=self.getFilterOpts(), sort=self.getSortOpts(),
+                                        unwatched=self.filterUnwatched, subDir=self.subDir,
+                                        timing_callback=self.prefetcher.addTiming)
+        self.tasks.add(task)
+        return task
 
 
 class PostersWindow(kodigui.ControlledWindow):
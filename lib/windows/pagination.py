@@ -140,13 +140,14 @@ class MCLPaginator(object):
                 mli = self.createListItem(item)
 
                 if mli:
-                    mli.setProperty('index', str(idx))
-                    self.prepareListItem(item, mli)
-                    if thumbFallback:
-                        if callable(thumbFallback):
-                            mli.setProperty('thumb.fallback', thumbFallback(item))
-                        else:
-                            mli.setProperty('thumb.fallback', thumbFallback)
+                    with mli.batch():
+                        mli.setProperty('index', str(idx))
+                        self.prepareListItem(item, mli)
+                        if thumbFallback:
+                            if callable(thumbFallback):
+                                mli.setProperty('thumb.fallback', thumbFallback(item))
+                            else:
+                                mli.setProperty('thumb.fallback', thumbFallback)
 
                     finalItems.append(mli)
                     idx += 1
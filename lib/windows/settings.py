@@ -813,6 +813,9 @@ class SelectDialog(kodigui.BaseDialog, util.CronReceiver):
     width = 1920
     height = 1080
 
+    # tick() closes the dialog once playback has ended
+    TICK_INTERVAL = 0.5
+
     OPTIONS_LIST_ID = 100
 
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,47 @@
+"""
+The add-on only runs inside Kodi. These tests exercise the parts that don't need it, with just enough of kodi_six
+faked for the modules to import.
+"""
+import os
+import sys
+from unittest import mock
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, 'lib', '_included_packages')]
+
+
+class Monitor(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+    def abortRequested(self):
+        return False
+
+    def waitForAbort(self, timeout=None):
+        return False
+
+
+class Player(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+class Window(object):
+    def __init__(self, *args, **kwargs):
+        pass
+
+
+kodi = mock.MagicMock()
+kodi.xbmc.Monitor = Monitor
+kodi.xbmc.Player = Player
+kodi.xbmcgui.WindowXML = kodi.xbmcgui.WindowXMLDialog = Window
+sys.modules.setdefault('kodi_six', kodi)
+for name in ('xbmc', 'xbmcaddon', 'xbmcgui', 'xbmcvfs'):
+    sys.modules.setdefault('kodi_six.' + name, getattr(sys.modules['kodi_six'], name))
+
+from plexnet import util as plexnetUtil  # noqa: E402
+
+# logging and preferences, provided by lib.plex's PlexInterface in the add-on
+plexnetUtil.setInterface(mock.MagicMock())
+# signals, provided by plexnet.plexapp's App
+plexnetUtil.setApp(mock.MagicMock())
@@ -0,0 +1,49 @@
+import threading
+
+from lib import backgroundthread
+
+
+class Job(backgroundthread.Task):
+    def __init__(self, priority=None):
+        backgroundthread.Task.__init__(self, priority)
+        self.runs = 0
+
+    def run(self):
+        self.runs += 1
+
+
+def test_reput_of_queued_task_is_counted_once():
+    queue = backgroundthread.IndexedPriorityQueue()
+    task, other = Job(1), Job(2)
+    queue.put(task)
+    queue.put(other)
+    # e.g. addTasksToFront() with tasks that are still queued
+    queue.put(task)
+    assert queue.qsize() == 2
+    assert queue.unfinished_tasks == 2
+
+    while not queue.empty():
+        queue.taskDone(queue.get())
+
+    done = threading.Event()
+    thread = threading.Thread(target=lambda: (queue.waitDone(lambda: False), done.set()))
+    thread.daemon = True
+    thread.start()
+    assert done.wait(2)
+
+
+def test_kill_returns_after_tasks_are_put_again():
+    threader = backgroundthread.BackgroundThreader('test', worker_count=1)
+    try:
+        tasks = [Job(i) for i in range(3)]
+        threader.addTasks(tasks)
+        threader.addTasksToFront(tasks)
+
+        done = threading.Event()
+        thread = threading.Thread(target=lambda: (threader.kill(), done.set()))
+        thread.daemon = True
+        thread.start()
+        assert done.wait(5)
+        assert all(t.runs for t in tasks)
+    finally:
+        threader.shutdown()
@@ -0,0 +1,85 @@
+from lib.windows import kodigui
+
+
+class Row(object):
+    def __init__(self, label):
+        self.label = label
+        self.properties = {}
+
+    def setProperties(self, properties):
+        self.properties.update(properties)
+
+    def setProperty(self, key, value):
+        self.properties[key] = value
+
+    def setLabel(self, label):
+        self.label = label
+
+    setLabel2 = setArt = setPath = lambda self, value: None
+
+
+class Control(object):
+    """
+    A list control that only keeps what's written to its rows.
+    """
+    def __init__(self):
+        self.rows = []
+        self.selected = 0
+
+    def addItems(self, items):
+        assert all(isinstance(i, str) for i in items)
+        self.rows += [Row(i) for i in items]
+
+    def getListItem(self, idx):
+        return self.rows[idx]
+
+    def getSelectedPosition(self):
+        return self.selected
+
+
+class Window(object):
+    def __init__(self):
+        self.control = Control()
+
+    def getControl(self, control_id):
+        return self.control
+
+
+def virtualList(size):
+    window = Window()
+    control = kodigui.ManagedControlList(window, 1, 5)
+    control.addVirtualItems(size, lambda pos: {'index': str(pos)})
+    return control, window.control
+
+
+def placed(control):
+    return [i for i, row in enumerate(control.rows) if row.properties]
+
+
+def test_placeholders_are_only_set_up_near_the_selection():
+    control, kodiControl = virtualList(10000)
+    assert len(kodiControl.rows) == 10000
+    assert placed(kodiControl) == list(range(kodigui.VirtualItems.WINDOW))
+    assert kodiControl.rows[5].properties['index'] == '5'
+
+    control.placeVirtualItems(5000, 5010)
+    assert placed(kodiControl)[-10:] == list(range(5000, 5010))
+
+    # a position accessed outside the window gets its placeholder first
+    mli = control[9000]
+    assert kodiControl.rows[9000].properties['index'] == '9000'
+    assert mli.properties['index'] == '9000'
+
+
+def test_new_control_sets_up_around_the_selection():
+    control, kodiControl = virtualList(10000)
+    control[7000].setProperty('title', 'loaded')
+
+    window = Window()
+    window.control.selected = 3000
+    control.newControl(window, 1)
+    rows = window.control.rows
+    assert len(rows) == 10000
+    assert placed(window.control) == (list(range(3000 - kodigui.VirtualItems.WINDOW, 3000 + kodigui.VirtualItems.WINDOW))
+                                      + [7000])
+    assert rows[7000].properties['title'] == 'loaded'
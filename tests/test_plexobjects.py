@@ -0,0 +1,89 @@
+import threading
+import time
+from xml.etree import ElementTree
+
+from plexnet import asyncadapter, plexobjects
+
+
+class Server(object):
+    """
+    Answers /library/metadata/<keys> with a fresh element per key. A request for "hold" blocks until released, a
+    batched request (several keys) runs onBatch instead.
+    """
+    def __init__(self):
+        self.paths = []
+        self.release = threading.Event()
+        self.onBatch = None
+
+    def query(self, path, params=None):
+        self.paths.append(path)
+        keys = path.rsplit('/', 1)[1].split(',')
+        if keys == ['hold']:
+            self.release.wait(5)
+        elif len(keys) > 1 and self.onBatch:
+            return self.onBatch()
+
+        root = ElementTree.Element('MediaContainer')
+        for key in keys:
+            ElementTree.SubElement(root, 'Video', ratingKey=key, title='fresh ' + key)
+        return root
+
+
+def item(server, key):
+    return plexobjects.PlexObject(ElementTree.Element('Video', ratingKey=key, title='stale ' + key), server=server)
+
+
+def test_follower_reloads_itself_when_the_leader_is_canceled():
+    server = Server()
+    held, leader, follower = item(server, 'hold'), item(server, '1'), item(server, '2')
+    token = asyncadapter.CancelToken()
+
+    def cancelLeader():
+        token.cancel()
+        return None
+
+    server.onBatch = cancelLeader
+
+    def reloadLeader():
+        with token:
+            leader.reload()
+
+    # a reload in flight makes the next one wait for others to batch with
+    threads = [threading.Thread(target=held.reload)]
+    threads[0].start()
+    while not server.paths:
+        time.sleep(0.001)
+
+    threads.append(threading.Thread(target=reloadLeader))
+    threads[-1].start()
+    time.sleep(0.01)
+    threads.append(threading.Thread(target=follower.reload))
+    threads[-1].start()
+
+    threads[1].join(5)
+    threads[2].join(5)
+    server.release.set()
+    threads[0].join(5)
+
+    assert '/library/metadata/1,2' in server.paths
+    assert follower.get('title') == 'fresh 2'
+    assert follower._reloaded
+    assert leader.get('title') == 'stale 1'
+    assert not leader._reloaded
+    assert '/library/metadata/1' not in server.paths
+
+
+def test_items_missing_from_the_batch_are_not_marked_fresh():
+    server = Server()
+    present, missing = item(server, '1'), item(server, '2')
+
+    def onlyFirst():
+        root = ElementTree.Element('MediaContainer')
+        ElementTree.SubElement(root, 'Video', ratingKey='1', title='fresh 1')
+        return root
+
+    server.onBatch = onlyFirst
+    plexobjects.reloadItems([present, missing])
+
+    assert present._reloaded and present.get('title') == 'fresh 1'
+    assert not missing._reloaded
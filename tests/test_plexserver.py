@@ -0,0 +1,79 @@
+import io
+
+import pytest
+import urllib3
+
+from plexnet import plexserver
+
+LISTING = b'<MediaContainer size="3"><Video ratingKey="1"/><Video ratingKey="2"/><Video ratingKey="3"/></MediaContainer>'
+
+
+class Source(io.BytesIO):
+    """
+    A response body read in small pieces, optionally raising error once it's used up.
+    """
+    def __init__(self, data, error=None):
+        io.BytesIO.__init__(self, data)
+        self.error = error
+        self.closes = 0
+
+    def read(self, size=-1):
+        data = io.BytesIO.read(self, 16)
+        if not data and self.error:
+            raise self.error
+        return data
+
+    def close(self):
+        self.closes += 1
+
+
+def parse(source):
+    closed = []
+    data = plexserver.IterparseElement(source, closed.append)
+    return data, [elem.attrib['ratingKey'] for elem in data], closed
+
+
+def test_complete_stream():
+    source = Source(LISTING)
+    data, keys, closed = parse(source)
+    assert keys == ['1', '2', '3']
+    assert not data.failed
+    assert closed == [True]
+
+
+@pytest.mark.parametrize('body', [
+    LISTING[:60],
+    LISTING[:60] + b'<Video ratingKey="2"></Audio></MediaContainer>',
+])
+def test_truncated_or_malformed_stream(body):
+    source = Source(body)
+    data, keys, closed = parse(source)
+    assert keys == ['1']
+    assert data.failed
+    assert closed == [False]
+    assert source.closes == 1
+
+
+@pytest.mark.parametrize('error', [
+    urllib3.exceptions.ProtocolError('Connection broken'),
+    urllib3.exceptions.ReadTimeoutError(None, '/', 'Read timed out.'),
+    urllib3.exceptions.DecodeError('Received response with content-encoding: gzip, but failed to decode it.'),
+])
+def test_stream_breaking_off(error):
+    source = Source(LISTING[:60], error)
+    data, keys, closed = parse(source)
+    assert keys == ['1']
+    assert data.failed
+    assert closed == [False]
+    assert source.closes == 1
+
+
+def test_empty_and_malformed_bodies():
+    empty = Source(b'')
+    assert plexserver.PlexServer._iterparse(None, empty) is None
+    assert empty.closes == 1
+
+    garbled = Source(b'<Media')
+    with pytest.raises(plexserver.ElementTree.ParseError):
+        plexserver.PlexServer._iterparse(None, garbled)
+    assert garbled.closes == 1
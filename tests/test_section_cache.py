@@ -0,0 +1,24 @@
+from lib import section_cache
+
+
+class Section(object):
+    def __init__(self, version):
+        self.key = '1'
+        self.server = type('Server', (object,), {'uuid': 'server'})
+        self.version = version
+
+    def get(self, attr):
+        return attr == 'contentChangedAt' and self.version or None
+
+
+def test_jump_index_keeps_its_view_key(tmp_path):
+    cache = section_cache.SectionSnapshotCache(str(tmp_path))
+    view = {"type": None, "sort": ('titleSort', 'asc'), "filter": None, "unwatched": True}
+    index = section_cache.JumpIndex(2, [['A', 'A', 2]], '100 1700000000')
+
+    cache.setJumpIndex(Section('100'), view, index)
+    stored = cache.getJumpIndex(Section('100'), view)
+    assert stored.totalSize == 2 and stored.jumpList == [['A', 'A', 2]]
+    assert stored.viewKey == '100 1700000000'
+
+    assert cache.getJumpIndex(Section('101'), view) is None